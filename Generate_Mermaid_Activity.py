@@ -0,0 +1,52 @@
+from Generate_Svg_Activity import DotBuilder
+from Generate_Uml_Activity import diagram_ref
+
+# Mermaid flowchart (za Markdown dokumentaciju): isti obilazak stabla kao
+# za Graphviz, samo druga sintaksa čvorova i grana.
+
+def mermaid_quote(text):
+    return '"' + text.replace('"', "#quot;") + '"'
+
+class MermaidBuilder(DotBuilder):
+    LINK_EXT = ".mmd"
+    SHAPES = {
+        "box":          ("(", ")"),
+        "diamond":      ("{", "}"),
+        "point":        ("((", "))"),
+        "circle":       ("((", "))"),
+        "doublecircle": ("(((", ")))"),
+    }
+
+    def node(self, label, shape="box", extra=""):
+        self.count += 1
+        name = f"n{self.count}"
+        open_, close = self.SHAPES.get(shape, ("[", "]"))
+        self.lines.append(f"    {name}{open_}{mermaid_quote(label or ' ')}{close}")
+        if shape == "diamond":
+            self.lines.append(f"    class {name} decision")
+        return name
+
+    def link(self, name, act):
+        ref = diagram_ref(act) if self.link_prefix is not None else None
+        if ref is not None:
+            self.lines.append(f"    click {name} href {mermaid_quote(self.link_prefix + ref + self.LINK_EXT)}")
+
+    def connect(self, exits, target):
+        for src, label in exits:
+            if label:
+                self.lines.append(f"    {src} -->|{mermaid_quote(label)}| {target}")
+            else:
+                self.lines.append(f"    {src} --> {target}")
+
+def generate_activity_mermaid(activities, source=None, link_prefix=None):
+    builder = MermaidBuilder(source, link_prefix)
+    start = builder.node("start", "circle")
+    end = builder.emit_seq(activities, [(start, "")])
+    stop = builder.node("stop", "doublecircle")
+    builder.connect(end, stop)
+    head = [
+        "flowchart TD",
+        "    classDef default fill:#dfefff,stroke:#3399cc",
+        "    classDef decision fill:#ffffcc,stroke:#3399cc",
+    ]
+    return "\n".join(head + builder.lines + [""])
@@ -0,0 +1,456 @@
+from Generate_Uml_Activity import (activity_code, activity_cond, diagram_ref, extract_body,
+                                   extract_condition)
+
+# Brzi prikaz dijagrama aktivnosti bez PlantUML-a (i JVM-a): jednostavan
+# vertikalni raspored - akcije jedna ispod druge, romb za if/switch (grane
+# jedna pored druge) i za uslov petlje, s povratnom granom lijevo od tijela.
+
+NODE_H = 28
+DIAMOND_H = 36
+GAP = 20
+CHAR_W = 7.2
+MIN_W = 40
+MAX_LABEL = 60
+BRANCH_GAP = 24
+LOOP_MARGIN = 18
+MARGIN = 20
+
+LOOP_TYPES = ("while", "for", "foreach", "do-while")
+
+def short_label(text):
+    text = " ".join(text.split())
+    if len(text) > MAX_LABEL:
+        text = text[:MAX_LABEL - 1] + "…"
+    return text
+
+def xml_escape(text):
+    return (text.replace("&", "&amp;").replace("<", "&lt;")
+                .replace(">", "&gt;").replace('"', "&quot;"))
+
+def text_width(text):
+    return max(MIN_W, len(text) * CHAR_W + 24)
+
+def action_label(act, source):
+    t = act["type"].lower()
+    code = activity_code(act, source)
+    if t == "call":
+        return short_label(f"Poziv funkcije {code}")
+    if t in ("break", "continue"):
+        return t.upper()
+    return short_label(code.rstrip(";").strip())
+
+def loop_cond(act, source):
+    t = act["type"].lower()
+    cond = activity_cond(act, source)
+    if cond is None:
+        cond = extract_condition(activity_code(act, source), "while" if t == "do-while" else t)
+    return short_label(f"{t.upper()} {cond}")
+
+def loop_body(act, source):
+    # petlja bez djece: tijelo se crta iz teksta, kao u PlantUML generatoru
+    if act.get("children"):
+        return act["children"]
+    body = extract_body(activity_code(act, source))
+    return [{"type": "stmt", "code": s.strip()} for s in body.split(";") if s.strip()]
+
+def decision_branches(act, source):
+    # if/switch -> (tekst romba, [(oznaka grane, djeca), ...])
+    children = act.get("children", [])
+    if act["type"].lower() == "if":
+        branches = []
+        for branch in children:
+            if branch["kind"] == "else":
+                branches.append(("else", branch.get("children", [])))
+            else:
+                branches.append((short_label(activity_cond(branch, source)), branch.get("children", [])))
+        label = "IF " + branches[0][0] if branches else "IF"
+        if branches:
+            branches[0] = ("true", branches[0][1])
+        if not any(b["kind"] == "else" for b in children):
+            branches.append(("false", []))
+        return short_label(label), branches
+
+    expr = activity_cond(act, source) or ""
+    branches = [(short_label(f"case {activity_cond(c, source)}"), c.get("children", []))
+                for c in children if c["type"] == "case"]
+    default = [c for c in children if c["type"] == "default"]
+    if default or not act.get("partial"):
+        branches.append(("default", default[0].get("children", []) if default else []))
+    return short_label(f"SWITCH {expr}"), branches
+
+class FlowLayout:
+    def __init__(self, source=None, link_prefix=None):
+        self.source = source
+        self.link_prefix = link_prefix
+        self.bodies = {}    # id(petlja) -> (petlja, tijelo)
+        # id(niz ili aktivnost) -> (objekat, (lijevo, desno, visina)); objekat se
+        # čuva da privremeni nizovi (npr. tijelo petlje iz teksta) ne bi oslobodili id
+        self.sizes = {}
+        self.out = []
+        # petlje i switch-evi oko trenutne aktivnosti; break/continue u petlji
+        # skaču na izlaz/uslov petlje, a u switch-u samo završavaju granu
+        self.jump_targets = []
+
+    def body(self, act):
+        if id(act) not in self.bodies:
+            self.bodies[id(act)] = (act, loop_body(act, self.source))
+        return self.bodies[id(act)][1]
+
+    # ---- mjerenje: širina lijevo/desno od ose i visina ----
+
+    def measure_seq(self, acts):
+        key = ("seq", id(acts))
+        if key in self.sizes:
+            return self.sizes[key][1]
+        left = right = MIN_W / 2
+        height = 0
+        for act in acts:
+            l, r, h = self.measure(act)
+            left, right = max(left, l), max(right, r)
+            height += h
+        height += GAP * max(0, len(acts) - 1)
+        self.sizes[key] = (acts, (left, right, height))
+        return left, right, height
+
+    def measure(self, act):
+        key = id(act)
+        if key in self.sizes:
+            return self.sizes[key][1]
+        t = act["type"].lower()
+        if t in ("if", "switch"):
+            size = self.measure_decision(act)
+        elif t in LOOP_TYPES:
+            l, r, h = self.measure_seq(self.body(act))
+            half = text_width(loop_cond(act, self.source)) / 2 + 10
+            size = (max(half, l) + LOOP_MARGIN, max(half, r) + LOOP_MARGIN,
+                    DIAMOND_H + GAP + h + GAP)
+        elif t == "call":
+            l, r, h = self.measure_seq(act.get("children", []))
+            half = max(text_width(action_label(act, self.source)), text_width(self.call_exit(act))) / 2
+            size = (max(half, l), max(half, r),
+                    NODE_H + GAP + (h + GAP if act.get("children") else 0) + NODE_H)
+        else:
+            half = text_width(action_label(act, self.source)) / 2
+            size = (half, half, NODE_H)
+        self.sizes[key] = (act, size)
+        return size
+
+    def slots(self, branches):
+        widths = []
+        height = 0
+        for label, children in branches:
+            l, r, h = self.measure_seq(children)
+            widths.append(2 * max(l, r, text_width(label) / 2))
+            height = max(height, h)
+        return widths, height
+
+    def measure_decision(self, act):
+        label, branches = decision_branches(act, self.source)
+        widths, height = self.slots(branches)
+        total = sum(widths) + BRANCH_GAP * (len(widths) - 1)
+        half = max(total, text_width(label) + 20) / 2
+        return (half, half, DIAMOND_H + GAP + height + GAP)
+
+    def call_exit(self, act):
+        return short_label("IZLAZ IZ FUNKCIJE " + activity_code(act, self.source).split("(")[0])
+
+    # ---- crtanje ----
+
+    def line(self, points, arrow=True, dashed=False):
+        pts = " ".join(f"{x:.1f},{y:.1f}" for x, y in points)
+        extra = ' marker-end="url(#arrow)"' if arrow else ""
+        if dashed:
+            extra += ' stroke-dasharray="4 3"'
+        self.out.append(f'<polyline points="{pts}" fill="none" stroke="#444444"{extra}/>')
+
+    def label(self, x, y, text, anchor="middle", size=12):
+        self.out.append(f'<text x="{x:.1f}" y="{y:.1f}" text-anchor="{anchor}" '
+                        f'font-size="{size}">{xml_escape(text)}</text>')
+
+    def box(self, cx, y, text, fill="#dfefff"):
+        w = text_width(text)
+        self.out.append(f'<rect x="{cx - w / 2:.1f}" y="{y:.1f}" width="{w:.1f}" height="{NODE_H}" '
+                        f'rx="8" fill="{fill}" stroke="#3399cc"/>')
+        self.label(cx, y + NODE_H / 2 + 4, text)
+
+    def diamond(self, cx, y, text):
+        w = text_width(text) + 20
+        h = DIAMOND_H
+        self.out.append(f'<polygon points="{cx:.1f},{y:.1f} {cx + w / 2:.1f},{y + h / 2:.1f} '
+                        f'{cx:.1f},{y + h:.1f} {cx - w / 2:.1f},{y + h / 2:.1f}" '
+                        f'fill="#ffffcc" stroke="#3399cc"/>')
+        self.label(cx, y + h / 2 + 4, text)
+
+    def link(self, act):
+        # href ka SVG-u drugog dijagrama (<fajl>__<funkcija>.svg) ili None
+        ref = diagram_ref(act) if self.link_prefix is not None else None
+        return None if ref is None else f"{self.link_prefix}{ref}.svg"
+
+    def is_jump(self, act):
+        return (act["type"].lower() in ("break", "continue")
+                and bool(self.jump_targets) and self.jump_targets[-1] is not None)
+
+    def ends_in_jump(self, acts):
+        return bool(acts) and self.is_jump(acts[-1])
+
+    def draw_seq(self, acts, cx, y):
+        # vraća y donje ivice niza
+        for i, act in enumerate(acts):
+            if i:
+                # iza break/continue nema toka (nedostižne naredbe)
+                if not self.is_jump(acts[i - 1]):
+                    self.line([(cx, y), (cx, y + GAP)])
+                y += GAP
+            y = self.draw(act, cx, y)
+        return y
+
+    def draw_jump(self, act, cx, y):
+        # isprekidana grana od break-a do izlaza petlje, od continue do uslova
+        loop = self.jump_targets[-1]
+        half = text_width(action_label(act, self.source)) / 2
+        mid = y + NODE_H / 2
+        if act["type"].lower() == "continue":
+            loop["continues"] += 1
+        if act["type"].lower() == "break":
+            points = [(cx + half, mid), (loop["exit_x"], mid)]
+            if loop["exit_y"] is not None:
+                points += [(loop["exit_x"], loop["exit_y"]), (loop["cx"], loop["exit_y"])]
+        elif loop["cond_y"] is None:
+            points = [(cx - half, mid), (loop["back_x"], mid)]
+        else:
+            # do-while: uslov je ispod tijela, kanal desno (lijevo je povratna grana)
+            x = loop["exit_x"] - LOOP_MARGIN / 3
+            above = loop["cond_y"] - GAP / 2
+            points = [(cx + half, mid), (x, mid), (x, above), (loop["cx"], above),
+                      (loop["cx"], loop["cond_y"])]
+        self.line(points, dashed=True)
+
+    def draw(self, act, cx, y):
+        t = act["type"].lower()
+        if t in ("if", "switch"):
+            return self.draw_decision(act, cx, y)
+        if t in LOOP_TYPES:
+            return self.draw_loop(act, cx, y)
+        if t == "call":
+            self.box(cx, y, action_label(act, self.source))
+            y += NODE_H
+            if act.get("children"):
+                self.line([(cx, y), (cx, y + GAP)])
+                # tijelo funkcije ne može izaći iz petlje pozivaoca
+                self.jump_targets.append(None)
+                y = self.draw_seq(act["children"], cx, y + GAP)
+                self.jump_targets.pop()
+            self.line([(cx, y), (cx, y + GAP)])
+            self.box(cx, y + GAP, self.call_exit(act))
+            return y + GAP + NODE_H
+        fill = "#ffd6d6" if t in ("break", "continue") else "#dfefff"
+        href = self.link(act)
+        if href:
+            self.out.append(f'<a href="{xml_escape(href)}">')
+        self.box(cx, y, action_label(act, self.source), fill)
+        if href:
+            self.out.append("</a>")
+        if self.is_jump(act):
+            self.draw_jump(act, cx, y)
+        return y + NODE_H
+
+    def draw_decision(self, act, cx, y):
+        label, branches = decision_branches(act, self.source)
+        widths, _ = self.slots(branches)
+        total_h = self.measure(act)[2]
+        self.diamond(cx, y, label)
+        top = y + DIAMOND_H
+        bottom = y + total_h
+        x = cx - (sum(widths) + BRANCH_GAP * (len(widths) - 1)) / 2
+        if act["type"].lower() == "switch":
+            self.jump_targets.append(None)
+        for (text, children), w in zip(branches, widths):
+            bx = x + w / 2
+            self.line([(cx, top), (bx, top + GAP / 2), (bx, top + GAP)], arrow=bool(children))
+            self.label(bx + 4, top + GAP / 2 + 2, text, anchor="start", size=10)
+            end = self.draw_seq(children, bx, top + GAP) if children else top + GAP
+            if not self.ends_in_jump(children):
+                self.line([(bx, end), (bx, bottom - GAP / 2), (cx, bottom)], arrow=False)
+            x += w + BRANCH_GAP
+        if act["type"].lower() == "switch":
+            self.jump_targets.pop()
+        return bottom
+
+    def draw_loop(self, act, cx, y):
+        left, right, total_h = self.measure(act)
+        body = self.body(act)
+        cond = loop_cond(act, self.source)
+        back_x = cx - left + LOOP_MARGIN / 2
+        exit_x = cx + right - LOOP_MARGIN / 2
+        half = (text_width(cond) + 20) / 2
+        if act["type"].lower() == "do-while":
+            # tijelo pa uslov; povratna grana ide od romba nazad na vrh
+            cond_y = y + self.measure_seq(body)[2] + GAP if body else None
+            self.jump_targets.append({"cx": cx, "back_x": back_x, "exit_x": exit_x,
+                                      "exit_y": y + total_h, "cond_y": cond_y, "continues": 0})
+            end = self.draw_seq(body, cx, y) if body else y
+            jumps = self.ends_in_jump(body)
+            self.jump_targets.pop()
+            if not jumps:
+                self.line([(cx, end), (cx, end + GAP)])
+            self.diamond(cx, end + GAP, cond)
+            mid = end + GAP + DIAMOND_H / 2
+            self.line([(cx - half, mid), (back_x, mid), (back_x, y - GAP / 2), (cx, y - GAP / 2)])
+            self.label(back_x + 4, mid - 4, "true", anchor="start", size=10)
+            self.line([(cx, end + GAP + DIAMOND_H), (cx, y + total_h)], arrow=False)
+            return y + total_h
+
+        self.diamond(cx, y, cond)
+        mid = y + DIAMOND_H / 2
+        self.line([(cx, y + DIAMOND_H), (cx, y + DIAMOND_H + GAP)], arrow=bool(body))
+        loop = {"cx": cx, "back_x": back_x, "exit_x": exit_x,
+                "exit_y": None, "cond_y": None, "continues": 0}
+        self.jump_targets.append(loop)
+        end = self.draw_seq(body, cx, y + DIAMOND_H + GAP) if body else y + DIAMOND_H + GAP
+        jumps = self.ends_in_jump(body)
+        self.jump_targets.pop()
+        if jumps:
+            # kraj tijela nema toka; povratna grana ostaje samo za continue
+            if loop["continues"]:
+                self.line([(back_x, end + GAP / 2), (back_x, mid), (cx - half, mid)])
+        else:
+            self.line([(cx, end), (cx, end + GAP / 2), (back_x, end + GAP / 2), (back_x, mid), (cx - half, mid)])
+        self.line([(cx + half, mid), (exit_x, mid), (exit_x, y + total_h), (cx, y + total_h)], arrow=False)
+        self.label(cx + half + 4, mid - 4, "false", anchor="start", size=10)
+        return y + total_h
+
+def generate_activity_svg(activities, source=None, link_prefix=None):
+    layout = FlowLayout(source, link_prefix)
+    left, right, height = layout.measure_seq(activities)
+    width = left + right + 2 * MARGIN + 2 * LOOP_MARGIN
+    cx = MARGIN + LOOP_MARGIN + left
+
+    y = MARGIN
+    layout.out.append(f'<circle cx="{cx:.1f}" cy="{y + 8:.1f}" r="8" fill="#222222"/>')
+    y += 16
+    layout.line([(cx, y), (cx, y + GAP)])
+    y = layout.draw_seq(activities, cx, y + GAP)
+    layout.line([(cx, y), (cx, y + GAP)])
+    y += GAP
+    layout.out.append(f'<circle cx="{cx:.1f}" cy="{y + 9:.1f}" r="9" fill="none" stroke="#222222"/>')
+    layout.out.append(f'<circle cx="{cx:.1f}" cy="{y + 9:.1f}" r="5" fill="#222222"/>')
+    total_h = y + 18 + MARGIN
+
+    head = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{total_h:.0f}" '
+        f'viewBox="0 0 {width:.0f} {total_h:.0f}" font-family="Consolas, monospace">',
+        '<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="7" '
+        'markerHeight="7" orient="auto-start-reverse"><path d="M 0 0 L 10 5 L 0 10 z" '
+        'fill="#444444"/></marker></defs>',
+        '<rect width="100%" height="100%" fill="#f9f9f9"/>',
+    ]
+    return "\n".join(head + layout.out + ["</svg>", ""])
+
+# ---- Graphviz DOT ----
+
+def dot_quote(text):
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+class DotBuilder:
+    LINK_EXT = ".dot.svg"
+
+    def __init__(self, source=None, link_prefix=None):
+        self.source = source
+        self.link_prefix = link_prefix
+        self.lines = []
+        self.count = 0
+        # petlje i switch-evi oko trenutne aktivnosti (kao u FlowLayout): u
+        # petlji break ide na izlaz, a continue na uslov; switch i tijelo
+        # funkcije su None - tamo break samo završava granu
+        self.jump_targets = []
+
+    def node(self, label, shape="box", extra=""):
+        self.count += 1
+        name = f"n{self.count}"
+        self.lines.append(f"  {name} [label={dot_quote(label)}, shape={shape}{extra}];")
+        return name
+
+    def link(self, name, act):
+        ref = diagram_ref(act) if self.link_prefix is not None else None
+        if ref is not None:
+            self.lines.append(f"  {name} [URL={dot_quote(self.link_prefix + ref + self.LINK_EXT)}];")
+
+    def connect(self, exits, target):
+        for src, label in exits:
+            attr = f" [label={dot_quote(label)}]" if label else ""
+            self.lines.append(f"  {src} -> {target}{attr};")
+
+    def emit_seq(self, acts, exits):
+        # exits: [(čvor, oznaka grane)] iz kojih se ulazi u sljedeću aktivnost
+        for act in acts:
+            exits = self.emit(act, exits)
+        return exits
+
+    def emit(self, act, exits):
+        t = act["type"].lower()
+        if t in ("if", "switch"):
+            label, branches = decision_branches(act, self.source)
+            d = self.node(label, "diamond", ', style=filled, fillcolor="#ffffcc"')
+            self.connect(exits, d)
+            out = []
+            if t == "switch":
+                self.jump_targets.append(None)
+            for text, children in branches:
+                out.extend(self.emit_seq(children, [(d, text)]))
+            if t == "switch":
+                self.jump_targets.pop()
+            return out
+        if t in LOOP_TYPES:
+            cond = loop_cond(act, self.source)
+            body = loop_body(act, self.source)
+            loop = {"breaks": [], "continues": []}
+            self.jump_targets.append(loop)
+            if t == "do-while":
+                head = self.node("", "point")
+                self.connect(exits, head)
+                end = self.emit_seq(body, [(head, "")])
+                d = self.node(cond, "diamond", ', style=filled, fillcolor="#ffffcc"')
+                self.connect(end + loop["continues"], d)
+                self.connect([(d, "true")], head)
+            else:
+                d = self.node(cond, "diamond", ', style=filled, fillcolor="#ffffcc"')
+                self.connect(exits, d)
+                end = self.emit_seq(body, [(d, "true")])
+                self.connect(end + loop["continues"], d)
+            self.jump_targets.pop()
+            return [(d, "false")] + loop["breaks"]
+        if t == "call":
+            n = self.node(action_label(act, self.source), extra=', style="rounded,filled", fillcolor="#dfefff"')
+            self.connect(exits, n)
+            self.jump_targets.append(None)
+            end = self.emit_seq(act.get("children", []), [(n, "")])
+            self.jump_targets.pop()
+            code = activity_code(act, self.source)
+            x = self.node(short_label("IZLAZ IZ FUNKCIJE " + code.split("(")[0]),
+                          extra=', style="rounded,filled", fillcolor="#dfefff"')
+            self.connect(end, x)
+            return [(x, "")]
+        fill = "#ffd6d6" if t in ("break", "continue") else "#dfefff"
+        n = self.node(action_label(act, self.source), extra=f', style="rounded,filled", fillcolor="{fill}"')
+        self.link(n, act)
+        self.connect(exits, n)
+        loop = self.jump_targets[-1] if self.jump_targets else None
+        if t in ("break", "continue") and loop is not None:
+            # grana se nastavlja tek na izlazu/uslovu petlje
+            loop["breaks" if t == "break" else "continues"].append((n, ""))
+            return []
+        return [(n, "")]
+
+def generate_activity_dot(activities, source=None, link_prefix=None):
+    builder = DotBuilder(source, link_prefix)
+    start = builder.node("", "circle", ', style=filled, fillcolor=black, width=0.2')
+    end = builder.emit_seq(activities, [(start, "")])
+    stop = builder.node("", "doublecircle", ', style=filled, fillcolor=black, width=0.15')
+    builder.connect(end, stop)
+    head = [
+        "digraph activity {",
+        '  graph [bgcolor="#f9f9f9"];',
+        '  node [fontname="Consolas", fontsize=12, color="#3399cc"];',
+        '  edge [color="#444444", fontsize=10];',
+    ]
+    return "\n".join(head + builder.lines + ["}", ""])
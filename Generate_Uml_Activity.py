@@ -26,6 +26,46 @@ def extract_body(code):
     m = re.search(r'\{(.*)\}$', code, re.DOTALL)
     return m.group(1).strip() if m else ""
 
+def span_text(span, source):
+    # Aktivnosti iz MyVisitor-a pokazuju u jedan zajednički izvorni kod;
+    # tekst se izrezuje tek kad zatreba, u jednoj liniji.
+    start, end = span
+    return " ".join(source[start:end].split())
+
+def activity_code(act, source=None):
+    if "span" in act and source is not None:
+        return span_text(act["span"], source)
+    return act.get("code", "")
+
+def activity_cond(act, source=None):
+    if "cond_span" in act and source is not None:
+        return span_text(act["cond_span"], source)
+    return act.get("cond")
+
+def with_code(activities, source):
+    out = []
+    for act in activities:
+        act = dict(act)
+        if "span" in act:
+            act["code"] = activity_code(act, source)
+            del act["span"]
+        if "cond_span" in act:
+            act["cond"] = activity_cond(act, source)
+            del act["cond_span"]
+        if "children" in act:
+            act["children"] = with_code(act["children"], source)
+        out.append(act)
+    return out
+
+def diagram_ref(act):
+    # ime posebnog dijagrama na koji aktivnost upućuje: poziv funkcije uz
+    # --split-functions (<fajl>__<funkcija>) ili sažeti dio (<fajl>__deoN)
+    if act["type"] == "call_ref":
+        return act.get("target")
+    if act["type"] == "collapsed":
+        return act.get("part")
+    return None
+
 def contains_type(target_type, node):
     if node["type"].lower() == target_type:
         return True
@@ -34,167 +74,36 @@ def contains_type(target_type, node):
             return True
     return False
 
-def generate_activity_uml(activities):
-    lines = [
-        "@startuml",
-        "set namespaceSeparator none",
-        "skinparam backgroundColor #f9f9f9",
-        "skinparam shadowing false",
-        "skinparam activity {",
-        "  BackgroundColor #dfefff",
-        "  BorderColor #3399cc",
-        "  FontColor black",
-        "  FontSize 14",
-        "  FontName Consolas",
-        "  FontStyle bold",
-        "  Padding 15",                
-        "  ArrowThickness 0.8",        
-        "  ArrowColor #444444",        
-        "  BarColor #3399cc",          
-        "}",
-        "skinparam note {",
-        "  FontSize 13",
-        "  BackgroundColor #ffffcc",
-        "  BorderColor #cccccc",
-        "  Padding 10",
-        "  Margin 10",
-        "}",
-        "skinparam defaultTextAlignment left",   
-        "skinparam maxMessageSize 100",          
-        "start"
-    ]
-
-
-    def _render(acts, indent):
-        pref = "  " * indent
-
-        for act in acts:
-            t = act["type"].lower()
-            code = act["code"].replace("\n", " ")
-
-            # ---- IF / ELSEIF / ELSE ----
-            if t == "if":
-                raw = code.replace("else if", "elseif")
-                parts = re.findall(
-                    r'(if|elseif|else)\s*(?:\((.*?)\))?\s*\{(.*?)}',
-                    raw, re.DOTALL
-                )
-
-                for idx, (kw, cond, body) in enumerate(parts):
-                    label = "true" if kw == "if" else "elseif" if kw == "elseif" else "else"
-                    cond_txt = f"{kw.upper()} {cond.strip()}" if cond else "ELSE"
-
-                    if kw == "if":
-                        lines.append(f"{pref}if ({cond_txt}) then ({label})")
-                    elif kw == "elseif":
-                        lines.append(f"{pref}elseif ({cond_txt}) then (true)")
-                    else:
-                        lines.append(f"{pref}else ({label})")
-
-                    stmts = [s.strip() for s in body.split(";") if s.strip()]
-                    for stmt in stmts:
-                        low = stmt.lower()
-                        if low.startswith("break"):
-                            lines.append(f"{pref}  :BREAK;")
-                            lines.append(f"{pref}break")
-                            break
-                        elif low.startswith("continue"):
-                            lines.append(f"{pref}  :CONTINUE;")
-                            break
-                        else:
-                            lines.append(f"{pref}  :{stylize_statement(stmt)};")
-
-                lines.append(f"{pref}endif")
-                continue
-
-
-            # ---- SWITCH kao IF/ELSEIF/ELSE ----
-            elif t == "switch":
-                expr = extract_condition(code, "switch")
-                body = extract_body(code)
-                pattern = re.compile(
-                    r'case\s*(.+?)\s*:(.*?)(?=case\s*.+?:|default:|\Z)',
-                    re.DOTALL
-                )
-                cases = pattern.findall(body)
-                m_def = re.search(r'default\s*:(.*)', body, re.DOTALL)
-                default_blk = m_def.group(1).strip() if m_def else ""
-
-                lines.append(f"{pref}:SWITCH ({expr});")
-
-                if cases:
-                    val, blk = cases[0]
-                    cond = f"{expr} == {val.strip()}"
-                    lines.append(f"{pref}if ({cond}) then (case {val.strip()})")
-                    for stmt in blk.split(";"):
-                        if stmt.strip():
-                            lines.append(f"{pref}  :{stylize_statement(stmt)};")
-                else:
-                    lines.append(f"{pref}if (FALSE) then (no cases)")
-
-                for val, blk in cases[1:]:
-                    cond = f"{expr} == {val.strip()}"
-                    lines.append(f"{pref}elseif ({cond}) then (case {val.strip()})")
-                    for stmt in blk.split(";"):
-                        if stmt.strip():
-                            lines.append(f"{pref}  :{stylize_statement(stmt)};")
-
-                lines.append(f"{pref}else (default)")
-                for stmt in default_blk.split(";"):
-                    if stmt.strip():
-                        lines.append(f"{pref}  :{stylize_statement(stmt)};")
-
-                lines.append(f"{pref}endif")
-                continue
-
-            # ---- LOOPS ----
-            if t in ("while", "for", "foreach", "do-while"):
-                cond_kw = "while" if t == "do-while" else t
-                cond = extract_condition(code, cond_kw)
-                label = f"{t}_loop".replace("-", "_")
-
-                lines.append(f"{pref}label {label}")
-                if t == "do-while":
-                    lines.append(f"{pref}repeat")
-                else:
-                    lines.append(f"{pref}while ({t.upper()} {cond}) is (false)")
-
-                if act.get("children"):
-                    for c in act["children"]:
-                        _render([c], indent + 1)
-                        typ = c["type"].lower()
-                        if typ == "break":
-                            lines.append(f"{pref}break")
-                            break
-                        elif typ == "continue":
-                            break
-                else:
-                    for stmt in extract_body(code).split(";"):
-                        stmt = stmt.strip()
-                        if not stmt:
-                            continue
-                        lines.append(f"{pref}  :{stylize_statement(stmt)};")
-
-                if t == "do-while":
-                    lines.append(f"{pref}repeat while (DO-WHILE {cond})")
-                else:
-                    lines.append(f"{pref}endwhile (true)")
-                lines.append(f"{pref}:izlaz iz {t}-petlje;")
-                continue
-
-            # ---- CALL ----
-            elif t == "call":
-                lines.append(f"{pref}:Poziv funkcije {stylize_statement(code)};")
-                _render(act.get("children", []), indent + 1)
-                fn = code.split("(")[0]
-                lines.append(f"{pref}:IZLAZ IZ FUNKCIJE {fn};")
-
-            # ---- DEFAULT ----
-            else:
-                lines.append(f"{pref}:{stylize_statement(code)};")
+UML_HEADER = (
+    "@startuml",
+    "set namespaceSeparator none",
+    "skinparam backgroundColor #f9f9f9",
+    "skinparam shadowing false",
+    "skinparam activity {",
+    "  BackgroundColor #dfefff",
+    "  BorderColor #3399cc",
+    "  FontColor black",
+    "  FontSize 14",
+    "  FontName Consolas",
+    "  FontStyle bold",
+    "  Padding 15",                
+    "  ArrowThickness 0.8",        
+    "  ArrowColor #444444",        
+    "  BarColor #3399cc",          
+    "}",
+    "skinparam note {",
+    "  FontSize 13",
+    "  BackgroundColor #ffffcc",
+    "  BorderColor #cccccc",
+    "  Padding 10",
+    "  Margin 10",
+    "}",
+    "skinparam defaultTextAlignment left",   
+    "skinparam maxMessageSize 100",          
+    "start"
+)
 
-    _render(activities, 0)
-    lines.append("""legend
+UML_LEGEND = """legend
     IF BLOK -> True ili False grana
     ELSE IF BLOK -> True ili False grana
     ELSE BLOK -> False grana
@@ -203,7 +112,409 @@ def generate_activity_uml(activities):
     WHILE petlja -> uslov ==> tijelo petlje
     DO WHILE petlja -> tijelo petlje ==> uslov
     SWITCH blok -> caseovi ==> default (false)
-    end legend""")
-    lines.append("stop")
-    lines.append("@enduml")
-    return "\n".join(lines)
+    end legend"""
+
+def _iter_activities(acts, indent, source, link_prefix=None):
+    pref = "  " * indent
+
+    for act in acts:
+        t = act["type"].lower()
+        code = activity_code(act, source).replace("\n", " ")
+
+        # ---- IF / ELSEIF / ELSE ----
+        if t == "if":
+            for branch in act.get("children", []):
+                cond = activity_cond(branch, source)
+                if branch["kind"] == "if":
+                    yield f"{pref}if (IF {cond}) then (true)"
+                elif branch["kind"] == "elseif":
+                    yield f"{pref}elseif (ELSEIF {cond}) then (true)"
+                else:
+                    yield f"{pref}else (else)"
+                yield from _iter_branch(branch.get("children", []), indent, source, False, link_prefix)
+
+            yield f"{pref}endif"
+            continue
+
+
+        # ---- SWITCH kao IF/ELSEIF/ELSE ----
+        elif t == "switch":
+            expr = activity_cond(act, source)
+            cases = [c for c in act.get("children", []) if c["type"] == "case"]
+            default = [c for c in act.get("children", []) if c["type"] == "default"]
+
+            yield f"{pref}:SWITCH ({expr});"
+
+            if not cases:
+                yield f"{pref}if (FALSE) then (no cases)"
+            for idx, case in enumerate(cases):
+                val = activity_cond(case, source)
+                kw = "if" if idx == 0 else "elseif"
+                yield f"{pref}{kw} ({expr} == {val}) then (case {val})"
+                yield from _iter_branch(case.get("children", []), indent, source, True, link_prefix)
+
+            # dio spakovanog switch-a (collapse_activities) nema svoj default
+            if default or not act.get("partial"):
+                yield f"{pref}else (default)"
+            for blk in default:
+                yield from _iter_branch(blk.get("children", []), indent, source, True, link_prefix)
+
+            yield f"{pref}endif"
+            continue
+
+        # ---- LOOPS ----
+        if t in ("while", "for", "foreach", "do-while"):
+            cond_kw = "while" if t == "do-while" else t
+            cond = activity_cond(act, source)
+            if cond is None:
+                cond = extract_condition(code, cond_kw)
+            label = f"{t}_loop".replace("-", "_")
+
+            yield f"{pref}label {label}"
+            if t == "do-while":
+                yield f"{pref}repeat"
+            else:
+                yield f"{pref}while ({t.upper()} {cond}) is (false)"
+
+            if act.get("children"):
+                for c in act["children"]:
+                    yield from _iter_activities([c], indent + 1, source, link_prefix)
+                    typ = c["type"].lower()
+                    if typ == "break":
+                        yield f"{pref}break"
+                        break
+                    elif typ == "continue":
+                        break
+            else:
+                for stmt in extract_body(code).split(";"):
+                    stmt = stmt.strip()
+                    if not stmt:
+                        continue
+                    yield f"{pref}  :{stylize_statement(stmt)};"
+
+            if t == "do-while":
+                yield f"{pref}repeat while (DO-WHILE {cond})"
+            else:
+                yield f"{pref}endwhile (true)"
+            yield f"{pref}:izlaz iz {t}-petlje;"
+            continue
+
+        # ---- CALL ----
+        elif t == "call":
+            yield f"{pref}:Poziv funkcije {stylize_statement(code)};"
+            yield from _iter_activities(act.get("children", []), indent + 1, source, link_prefix)
+            fn = code.split("(")[0]
+            yield f"{pref}:IZLAZ IZ FUNKCIJE {fn};"
+
+        # ---- DEFAULT ----
+        else:
+            ref = diagram_ref(act) if link_prefix is not None else None
+            if ref is None:
+                yield f"{pref}:{stylize_statement(code)};"
+            else:
+                # PlantUML link (klikabilan u SVG izlazu) ka slici drugog dijagrama
+                yield f"{pref}:{stylize_statement(code)}\\n[[{link_prefix}{ref}.png dijagram]];"
+
+def _iter_branch(children, indent, source, in_switch=False, link_prefix=None):
+    # Tijelo if grane ili case bloka; break/continue završavaju granu.
+    pref = "  " * indent
+    for c in children:
+        t = c["type"].lower()
+        if t == "break":
+            yield f"{pref}  :BREAK;"
+            if not in_switch:
+                yield f"{pref}break"
+            return
+        if t == "continue":
+            yield f"{pref}  :CONTINUE;"
+            return
+        yield from _iter_activities([c], indent + 1, source, link_prefix)
+
+# ---- BUDŽET ČVOROVA ----
+#
+# Prevelik dijagram (PLANTUML_LIMIT_SIZE, minute layout-a) se skraćuje:
+# najdublji if/switch/petlje/pozivi se sažimaju u jedan čvor "… N naredbi …",
+# predugi nizovi se pakuju u dijelove do budžeta, a sažeti dijelovi se po
+# želji vraćaju kao posebni dijagrami (i sami u budžetu). Ulazno stablo
+# se ne mijenja - podstabla su dijeljena (memoizovani inlining), pa se
+# kopiraju samo čvorovi iznad granice sažimanja.
+
+CONTAINER_TYPES = ("if", "switch", "while", "for", "foreach", "do-while", "call")
+STRUCTURAL_TYPES = ("branch", "case", "default")
+
+def _add_shifted(hist, other, shift):
+    for i, n in enumerate(other):
+        while len(hist) <= i + shift:
+            hist.append(0)
+        hist[i + shift] += n
+
+def _histogram(act, memo):
+    # broj čvorova po nivou ugniježđenosti; grane i caseovi su na istom
+    # nivou kao i naredbe u njima
+    entry = memo.get(id(act))
+    if entry is not None:
+        return entry[1]
+    hist = [1]
+    for child in act.get("children", ()):
+        if child["type"] in STRUCTURAL_TYPES:
+            _add_shifted(hist, [1], 1)
+            for grand in child.get("children", ()):
+                _add_shifted(hist, _histogram(grand, memo), 1)
+        else:
+            _add_shifted(hist, _histogram(child, memo), 1)
+    memo[id(act)] = (act, hist)
+    return hist
+
+def _statement_count(act, memo):
+    if act["type"] == "collapsed":
+        return act["count"]
+    entry = memo.get(id(act))
+    if entry is not None:
+        return entry[1]
+    n = 0 if act["type"] in STRUCTURAL_TYPES else 1
+    for child in act.get("children", ()):
+        n += _statement_count(child, memo)
+    memo[id(act)] = (act, n)
+    return n
+
+def _container_header(act, source):
+    t = act["type"].lower()
+    if t == "call":
+        return f"Poziv funkcije {activity_code(act, source)}"
+    if t == "if":
+        first = act["children"][0] if act.get("children") else {}
+        return f"IF {activity_cond(first, source) or ''}".strip()
+    if t == "switch":
+        return f"SWITCH ({activity_cond(act, source)})"
+    cond = activity_cond(act, source)
+    if cond is None:
+        cond = extract_condition(activity_code(act, source), "while" if t == "do-while" else t)
+    return f"{t.upper()} {cond}"
+
+def collapse_activities(activities, source=None, max_nodes=2000, parts=None, part_name=None,
+                        min_depth=0):
+    # parts (lista) dobija (ime, aktivnosti) za svaki sažeti dio; part_name()
+    # daje sljedeće ime. Vraća isti objekat ako je dijagram u budžetu.
+    memo = {}
+    levels = []
+    for act in activities:
+        _add_shifted(levels, _histogram(act, memo), 0)
+    if sum(levels) <= max_nodes:
+        return activities
+
+    # najdublja granica pri kojoj dijagram staje u budžet
+    cutoff = min(min_depth, len(levels) - 1)
+    size = sum(levels[:cutoff + 1])
+    while cutoff + 1 < len(levels) and size + levels[cutoff + 1] <= max_nodes:
+        cutoff += 1
+        size += levels[cutoff]
+
+    state = {
+        "source": source, "memo": memo, "counts": {}, "cutoff": cutoff,
+        "max_nodes": max_nodes, "parts": parts, "part_name": part_name,
+        "pending": [], "shared": {},
+    }
+    # ni na granici ne staje (predugi nizovi) -> nizovi se pakuju (_fit_seq)
+    out = _collapse_seq(activities, 0, None, state, max_nodes if size > max_nodes else None)
+
+    if parts is not None:
+        for name, acts, depth in state["pending"]:
+            idx = len(parts)
+            parts.append(None)
+            parts[idx] = (name, collapse_activities(acts, source, max_nodes, parts, part_name,
+                                                    depth))
+    return out
+
+def _summary(header, count, part_acts, min_depth, state, shared_key=None):
+    # ime poddijagrama ide u "part"; generatori ga crtaju kao link (diagram_ref)
+    text = f"{header} … {count} naredbi …".strip()
+    name = None
+    if state["parts"] is not None:
+        # isto dijeljeno podstablo -> isti poddijagram
+        name = state["shared"].get(shared_key) if shared_key is not None else None
+        if name is None:
+            name = state["part_name"]()
+            state["pending"].append((name, part_acts, min_depth))
+            if shared_key is not None:
+                state["shared"][shared_key] = name
+    return {"type": "collapsed", "code": text, "header": header, "count": count, "part": name}
+
+def _collapse_seq(acts, depth, parent, state, budget=None):
+    # budget: broj čvorova koji niz smije zauzeti, None ako staje bez pakovanja.
+    # Predugi nizovi se pakuju prije ulaska u djecu, pa spakovani dio ide u
+    # poddijagram netaknut.
+    if budget is None:
+        items = [(act, None) for act in acts]
+    else:
+        items = _fit_seq(acts, depth, parent, state, budget)
+    out = []
+    for act, budget in items:
+        inner = None if budget is None else max(1, budget - 1)
+        if act["type"] == "collapsed":
+            out.append(act)
+        elif act["type"] in STRUCTURAL_TYPES:
+            node = dict(act)
+            node["children"] = _collapse_seq(act.get("children", []), depth, act, state, inner)
+            out.append(node)
+        elif act.get("children") and act["type"] in CONTAINER_TYPES:
+            if depth >= state["cutoff"]:
+                count = _statement_count(act, state["counts"])
+                out.append(_summary(_container_header(act, state["source"]), count,
+                                    [act], 1, state, id(act)))
+            elif (budget is None
+                  and depth + len(_histogram(act, state["memo"])) - 1 <= state["cutoff"]):
+                out.append(act)
+            else:
+                node = dict(act)
+                node["children"] = _collapse_seq(act["children"], depth + 1, act, state, inner)
+                out.append(node)
+        else:
+            out.append(act)
+    return out
+
+def _weight(act, state):
+    # broj čvorova aktivnosti u dijagramu bez sažimanja
+    return sum(_histogram(act, state["memo"]))
+
+def _visible(act, depth, state):
+    # broj čvorova aktivnosti nakon sažimanja na granici (bez pakovanja)
+    t = act["type"]
+    if t in STRUCTURAL_TYPES:
+        return 1 + sum(_visible(c, depth, state) for c in act.get("children", ()))
+    if act.get("children") and t in CONTAINER_TYPES:
+        if depth >= state["cutoff"]:
+            return 1
+        return 1 + sum(_visible(c, depth + 1, state) for c in act["children"])
+    return 1
+
+def _expandable(act, depth, state):
+    return act["type"] in STRUCTURAL_TYPES or (
+        act.get("children") and act["type"] in CONTAINER_TYPES and depth < state["cutoff"])
+
+def _fit_seq(acts, depth, parent, state, budget):
+    # Niz preko budžeta: uzastopni čvorovi se pakuju u dijelove do max_nodes
+    # čvorova (puni poddijagrami), a ako ni sažeci ne staju, pakuju se i oni
+    # (dijelovi dijelova). Vraća [(aktivnost, budžet ili None)]: ostatak
+    # budžeta dijele čvorovi koji ostaju otvoreni (grane, caseovi, petlje).
+    def visible(seq):
+        return sum(_visible(a, depth, state) for a in seq)
+
+    packed = acts
+    while len(packed) > 1 and visible(packed) > budget:
+        repacked = _pack_seq(packed, parent, state)
+        if len(repacked) * 2 > len(packed) and visible(repacked) > budget:
+            # čvorovi su preteški da bi se pakovali po težini (rijetko dva
+            # susjedna staju u max_nodes): dijelovi po broju čvorova, koji se
+            # dalje sami sažimaju. Ugniježđeni niz naredbi
+            # može cijeli u jedan dio; vršni niz i caseovi/grane bi tako dali
+            # isti dijagram, pa se dijele bar na dva.
+            structural = packed[0]["type"] in STRUCTURAL_TYPES
+            least = 1 if parent is not None and not structural else 2
+            repacked = _pack_seq(packed, parent, state,
+                                 max(least, budget // (2 if structural else 1)))
+        if len(repacked) == len(packed):
+            break
+        packed = repacked
+
+    open_ = [a for a in packed if _expandable(a, depth, state) and _visible(a, depth, state) > 1]
+    fixed = visible(packed) - sum(_visible(a, depth, state) for a in open_)
+    share = max(2, (budget - fixed) // len(open_)) if open_ else None
+    ids = {id(a) for a in open_}
+    return [(a, share if id(a) in ids and _visible(a, depth, state) > share else None)
+            for a in packed]
+
+def _first_label(act, source):
+    # naslov sažetka: prva naredba ili uslov u dijelu
+    if act["type"] == "collapsed":
+        return act.get("header") or act["code"]
+    if act["type"] in CONTAINER_TYPES:
+        return _container_header(act, source)
+    return activity_code(act, source)
+
+def _case_range(act, source):
+    # (prvi, posljednji) uslov; spakovani case/grana nosi cijeli raspon
+    if "range" in act:
+        return act["range"]
+    cond = activity_cond(act, source)
+    return cond, cond
+
+def _pack_seq(acts, parent, state, chunks=None):
+    # Uzastopni čvorovi iste vrste (naredbe, caseovi ili grane) idu u dio dok
+    # ne popune max_nodes čvorova; čvor koji sam ne staje ostaje u nizu.
+    # chunks: umjesto po težini, niz se dijeli na toliko dijelova.
+    source = state["source"]
+    per_chunk = -(-len(acts) // chunks) if chunks else None
+    grouped = []
+    i = 0
+    while i < len(acts):
+        act = acts[i]
+        kind = act["type"]
+        if kind == "default" or (kind == "branch" and act["kind"] == "else"):
+            grouped.append(act)
+            i += 1
+            continue
+        structural = kind in STRUCTURAL_TYPES
+        # dio sa caseovima/granama dobija i svoj switch/if čvor
+        room = state["max_nodes"] - 1 if structural else state["max_nodes"]
+        chunk = []
+        size = 0
+        while i < len(acts):
+            nxt = acts[i]
+            if ((nxt["type"] in STRUCTURAL_TYPES) != structural or nxt["type"] == "default"
+                    or nxt.get("kind") == "else"):
+                break
+            if per_chunk is not None:
+                if len(chunk) == per_chunk:
+                    break
+            else:
+                weight = _weight(nxt, state)
+                if chunk and size + weight > room:
+                    break
+                size += weight
+            chunk.append(nxt)
+            i += 1
+        if len(chunk) == 1:
+            grouped.extend(chunk)
+            continue
+        count = sum(_statement_count(a, state["counts"]) for a in chunk)
+        first = _case_range(chunk[0], source)[0] if structural else None
+        last = _case_range(chunk[-1], source)[1] if structural else None
+        if kind == "case":
+            part = [{"type": "switch", "cond": activity_cond(parent, source), "partial": True,
+                     "children": chunk}]
+            summary = _summary(f"CASE {first}:", count, part, 1, state)
+            grouped.append({"type": "case", "cond": f"{first} … {last}", "range": (first, last),
+                            "children": [summary]})
+        elif kind == "branch":
+            part = [{"type": "if", "children": [dict(chunk[0], kind="if")] + chunk[1:]}]
+            keyword = "IF" if chunk[0]["kind"] == "if" else "ELSEIF"
+            summary = _summary(f"{keyword} {first}:", count, part, 1, state)
+            grouped.append({"type": "branch", "kind": chunk[0]["kind"], "cond": f"{first} … {last}",
+                            "range": (first, last), "children": [summary]})
+        else:
+            grouped.append(_summary(_first_label(chunk[0], source), count, chunk, 0, state))
+    return grouped
+
+def iter_activity_uml(activities, source=None, max_nodes=None, link_prefix=None):
+    # Linije dijagrama se generišu redom dok se obilazi stablo aktivnosti,
+    # bez sklapanja cijelog teksta u memoriji. link_prefix ("<fajl>__"):
+    # reference na druge dijagrame postaju linkovi.
+    if max_nodes:
+        activities = collapse_activities(activities, source, max_nodes)
+    yield from UML_HEADER
+    yield from _iter_activities(activities, 0, source, link_prefix)
+    yield UML_LEGEND
+    yield "stop"
+    yield "@enduml"
+
+def iter_activity_uml_text(activities, source=None, max_nodes=None, link_prefix=None):
+    # isti tekst kao generate_activity_uml, u komadima (linije + "\n")
+    first = True
+    for line in iter_activity_uml(activities, source, max_nodes, link_prefix):
+        if not first:
+            yield "\n"
+        first = False
+        yield line
+
+def generate_activity_uml(activities, source=None, max_nodes=None, link_prefix=None):
+    return "\n".join(iter_activity_uml(activities, source, max_nodes, link_prefix))
@@ -1,4 +1,5 @@
 import re
+import sys
 from antlr4 import *
 
 if "." in __name__:
@@ -8,7 +9,8 @@ else:
 from PhpParserVisitor import PhpParserVisitor
 
 class MyVisitor(PhpParserVisitor):
-    def __init__(self):
+    def __init__(self, max_inline_depth=32, max_inline_nodes=200000, inline_calls=True,
+                 counters=None):
         self.activities             = []      # top-level aktivnosti
         self.activity_stack         = []      # stek za blok-aktivnosti
         self.functionDeclarations   = {}      # funcName -> blockStatementContext
@@ -16,23 +18,226 @@ class MyVisitor(PhpParserVisitor):
         self.symbolTable            = {}      # varName -> tip
         self.functionParams         = {}      # funcName -> broj parametara
         self.functionParamNames     = {}      # funcName -> [param1, param2, ...]
+        self.source                 = None    # izvorni kod; aktivnosti čuvaju samo (start, end) raspone
+        self.functionSummaries      = {}      # funcName -> [sažetak obilaska tijela, ...]
+        self.summary_frames         = []      # okviri funkcija koje se trenutno inlinuju
+        self.inline_path            = []      # lanac funkcija koje se trenutno inlinuju
+        self.inline_nodes           = 0       # broj aktivnosti nastalih inliningom
+        self.max_inline_depth       = max_inline_depth
+        self.max_inline_nodes       = max_inline_nodes
+        self.inline_calls           = inline_calls  # False: poziv je referenca, funkcije imaju svoje dijagrame
+        self.functionActivities     = {}      # funcName -> aktivnosti tijela (samo kad inline_calls=False)
+        self.counters               = counters  # VisitorCounters ili None
+        self.findings               = []      # poruke iz report(), redom (čuvaju se u kešu)
+        self.inline_stats           = {
+            "recursive_refs": 0,      # rekurzivni pozivi zamijenjeni referencom
+            "depth_limited":  0,      # pozivi preko max_inline_depth
+            "budget_limited": 0,      # pozivi preko max_inline_nodes
+            "max_depth":      0,      # najveća dostignuta dubina inlininga
+        }
+
+    MAX_SUMMARY_VARIANTS = 8
+    # Svaki nivo inlininga troši po nekoliko Python okvira za svaku ugniježđenu
+    # naredbu tijela, pa max_inline_depth sam ne sprečava RecursionError: novi
+    # nivo se inlinuje samo dok je do limita ostalo bar ovoliko okvira.
+    INLINE_STACK_RESERVE = 200
 
     def semantic_error(self, message):
         print(f"[SEMANTIC ERROR] {message}")
         raise Exception("Semantička analiza prekinuta zbog greške.")
 
+    def report(self, message):
+        print(message)
+        self.findings.append(message)
+        for frame in self.summary_frames:
+            frame["findings"].append(message)
+
+    def is_declared(self, varName):
+        # Svaki okvir pamti da li je varijabla postojala na ulazu u funkciju -
+        # samo od toga zavisi rezultat obilaska tijela (parametri i lokalne
+        # varijable su uvijek isti).
+        for frame in self.summary_frames:
+            if varName not in frame["deps"]:
+                frame["deps"][varName] = varName in frame["entry"]
+        return varName in self.symbolTable
+
+    # ---- SAŽECI FUNKCIJA (memoizacija inlininga) ----
+
+    def find_summary(self, name):
+        path = tuple(self.inline_path)
+        for summary in self.functionSummaries.get(name, []):
+            if summary["limited"]:
+                # sadrži reference zbog rekurzije/dubine -> važi samo za isti lanac poziva
+                if summary["path"] != path:
+                    continue
+            elif (len(path) + summary["depth"] > self.max_inline_depth
+                  or (summary["called"] | {name}) & set(path)):
+                continue
+            if all((v in self.symbolTable) == was for v, was in summary["deps"].items()):
+                return summary
+        return None
+
+    def store_summary(self, name, frame, children):
+        variants = self.functionSummaries.setdefault(name, [])
+        variants.append({
+            "children": children,
+            "deps":     frame["deps"],
+            "findings": frame["findings"],
+            "called":   frame["called"],
+            "size":     self.inline_nodes - frame["nodes_start"],
+            "depth":    frame["depth"],
+            "limited":  frame["limited"],
+            "path":     tuple(self.inline_path),
+            "stats":    {k: self.inline_stats[k] - v for k, v in frame["stats_start"].items()},
+        })
+        if len(variants) > self.MAX_SUMMARY_VARIANTS:
+            variants.pop(0)
+
+    def replay_summary(self, summary):
+        self.inline_nodes += summary["size"]
+        if self.summary_frames:
+            parent = self.summary_frames[-1]
+            parent["depth"] = max(parent["depth"], summary["depth"] + 1)
+        for frame in self.summary_frames:
+            frame["limited"] = frame["limited"] or summary["limited"]
+            for v in summary["deps"]:
+                if v not in frame["deps"]:
+                    frame["deps"][v] = v in frame["entry"]
+            frame["called"].update(summary["called"])
+        self.calledFunctions.update(summary["called"])
+        # reference zbog rekurzije/dubine iz tijela se broje kao pri obilasku
+        for k, v in summary["stats"].items():
+            self.inline_stats[k] += v
+        self.inline_stats["max_depth"] = max(self.inline_stats["max_depth"],
+                                             len(self.inline_path) + summary["depth"])
+        for message in summary["findings"]:
+            self.report(message)
+
+    def inline_limit(self, name):
+        if name in self.inline_path:
+            return "recursive_refs", "rekurzivni poziv"
+        if len(self.inline_path) >= self.max_inline_depth \
+                or stack_depth() + self.INLINE_STACK_RESERVE > sys.getrecursionlimit():
+            return "depth_limited", "poziv (prekoračena dubina inlininga)"
+        if self.inline_nodes >= self.max_inline_nodes:
+            return "budget_limited", "poziv (prekoračen budžet čvorova)"
+        return None
+
+    def add_call_reference(self, name, args, reason):
+        stat, label = reason
+        self.inline_stats[stat] += 1
+        for frame in self.summary_frames:
+            # rezultat zavisi od lanca poziva / globalnog budžeta
+            frame["limited"] = True
+            if stat == "budget_limited":
+                frame["truncated"] = True
+        self.add_activity({ "type": "call_ref", "code": f"{label} → {name}({args})" })
+
     def add_activity(self, activity):
+        if self.counters is not None:
+            self.counters.count_activity(activity)
+        if self.inline_path:
+            self.inline_nodes += 1
         if self.activity_stack:
             self.activity_stack[-1]["children"].append(activity)
         else:
             self.activities.append(activity)
 
+    def text_of(self, ctx):
+        # Isto kao ctx.getText(), ali jednim prolazom kroz tokene umjesto
+        # rekurzivnog spajanja stringova na svakom nivou stabla.
+        if ctx is None:
+            return ""
+        if ctx.stop is None or ctx.stop.tokenIndex < ctx.start.tokenIndex:
+            return ""
+        tokens = ctx.parser.getTokenStream().tokens
+        text = "".join(t.text for t in tokens[ctx.start.tokenIndex:ctx.stop.tokenIndex + 1])
+        if self.counters is not None:
+            self.counters.count_text(text)
+        return text
+
+    def node_text(self, ctx):
+        text = ctx.getText()
+        if self.counters is not None:
+            self.counters.count_text(text)
+        return text
+
+    def regex(self, fn, pattern, text):
+        if self.counters is not None:
+            self.counters.count_regex(pattern)
+        return fn(pattern, text)
+
+    def span_of(self, ctx):
+        if self.source is None:
+            self.source = ctx.start.getInputStream().strdata
+        return (ctx.start.start, ctx.stop.stop + 1)
+
+    def span_between(self, open_node, close_node):
+        # tekst između zagrada, npr. zaglavlje for/foreach petlje
+        if self.source is None:
+            self.source = open_node.symbol.getInputStream().strdata
+        return (open_node.symbol.stop + 1, close_node.symbol.start)
+
+    def declare_from_assignment(self, text):
+        m = self.regex(re.match, r'\s*\$(\w+)\s*=\s*(.+)', text)
+        if not m:
+            return None
+        varName, value = m.group(1), m.group(2)
+        if value.startswith(('"', "'")):
+            t = 'string'
+        elif self.regex(re.match, r'^[\d\.]+$', value):
+            t = 'number'
+        elif value.startswith(('array(', '[')):
+            t = 'array'
+        else:
+            t = 'unknown'
+        self.symbolTable[varName] = t
+        return varName, t
+
 
     def visitPhpBlock(self, ctx: PhpParser.PhpBlockContext):
-        return self.visitChildren(ctx)
+        self.index_declarations(ctx)
+        self.visitChildren(ctx)
+        if not self.inline_calls:
+            self.visit_function_bodies()
+        return None
+
+    def visit_function_bodies(self):
+        # Svaka deklarisana funkcija se obilazi jednom, u svoj niz aktivnosti.
+        # Vidi varijable skripte (kao i pri inliningu) i svoje parametre.
+        script_symbols = self.symbolTable
+        for name, declCtx in self.functionDeclarations.items():
+            self.symbolTable = dict(script_symbols)
+            for param in self.functionParamNames.get(name, []):
+                self.symbolTable[param] = 'unknown'
+            body = { "type": "function", "children": [] }
+            self.activity_stack = [body]
+            self.visit(declCtx)
+            self.functionActivities[name] = body["children"]
+        self.activity_stack = []
+        self.symbolTable    = script_symbols
+
+    def index_declarations(self, root):
+        # Pre-pass: sve deklaracije funkcija su poznate prije obilaska, pa se
+        # mogu pozivati i funkcije deklarisane kasnije u fajlu. Izrazi ne mogu
+        # sadržavati deklaracije, pa se u njih ne ulazi.
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, PhpParser.FunctionDeclarationContext):
+                self.declare_function(node)
+            elif isinstance(node, PhpParser.ExpressionContext):
+                continue
+            for child in reversed(node.children or []):
+                if isinstance(child, ParserRuleContext):
+                    stack.append(child)
 
     def visitFunctionDeclaration(self, ctx: PhpParser.FunctionDeclarationContext):
-        funcName = ctx.id_().getText() if ctx.id_() else None
+        # deklaracije su već indeksirane u index_declarations()
+        return None
+
+    def declare_function(self, ctx):
+        funcName = self.node_text(ctx.id_()) if ctx.id_() else None
         if not funcName:
             return None
 
@@ -41,7 +246,7 @@ class MyVisitor(PhpParserVisitor):
         names = []
         if ctx.parameterList():
             for p in ctx.parameterList().parameter():
-                m = re.search(r'\$(\w+)', p.getText())
+                m = self.regex(re.search, r'\$(\w+)', self.node_text(p))
                 if m:
                     names.append(m.group(1))
 
@@ -51,224 +256,344 @@ class MyVisitor(PhpParserVisitor):
         
 
     def visitStatement(self, ctx: PhpParser.StatementContext):
-        text = ctx.getText().strip().lower()
-        if text.startswith("break"):
+        if ctx.breakStatement():
             self.add_activity({ "type": "break",    "code": "break;"    })
             return None
-        if text.startswith("continue"):
+        if ctx.continueStatement():
             self.add_activity({ "type": "continue", "code": "continue;" })
             return None
         return self.visitChildren(ctx)
 
     def visitExpressionStatement(self, ctx: PhpParser.ExpressionStatementContext):
-        text = ctx.getText().strip()
+        text = self.text_of(ctx).strip()
 
         # 1) dijeljenje s nulom
-        if re.search(r'/\s*0(\.0+)?([^\d]|$)', text):
+        if self.regex(re.search, r'/\s*0(\.0+)?([^\d]|$)', text):
             self.semantic_error(f"Dijeljenje s nulom u izrazu: '{text}'")
 
        
-        m = re.match(r'^\$(\w+)\s*=\s*(.+);$', text)
-        if m:
-            varName, value = m.group(1), m.group(2)
-            if value.startswith(('"', "'")):
-                t = 'string'
-            elif re.match(r'^[\d\.]+$', value):
-                t = 'number'
-            elif value.startswith(('array(', '[')):
-                t = 'array'
-            else:
-                t = 'unknown'
-            self.symbolTable[varName] = t
-            print(f"[INFO] Detektovana varijabla ${varName} tipa {t}")
+        declared = self.declare_from_assignment(text[:-1] if text.endswith(";") else text)
+        if declared:
+            self.report(f"[INFO] Detektovana varijabla ${declared[0]} tipa {declared[1]}")
 
        
-        for name, declCtx in self.functionDeclarations.items():
-            pat   = re.compile(rf'{name}\s*\((.*?)\)\s*;?$')
-            match = pat.search(text)
-            if not match:
+        calls = self.call_sites(ctx.expression())
+        for call in calls:
+            name = self.node_text(call.id_())
+            if name not in self.functionDeclarations and name not in ['echo','array','isset']:
+                self.semantic_error(f"Funkcija '{name}()' nije deklarisana.")
+
+        inlined = False
+        for call in calls:
+            name = self.node_text(call.id_())
+            if name not in self.functionDeclarations:
                 continue
 
-            args    = match.group(1).strip()
-            numArgs = len(args.split(',')) if args else 0
+            argList = call.expressionList()
+            args    = self.text_of(argList)
+            numArgs = len(argList.expression()) if argList else 0
             expArgs = self.functionParams.get(name, -1)
 
             if expArgs != -1 and numArgs != expArgs:
-                print(
+                self.report(
                     f"[SEMANTIC WARNING] "
                     f"Poziv funkcije '{name}' sa {numArgs} argumenata "
                     f"(očekivano: {expArgs})"
                 )
 
-            prev_stack = self.activity_stack.copy()
-            call_act   = {
-                "type": "call",
-                "code": f"{name}({args})",
-                "children": []
-            }
-            self.add_activity(call_act)
-            self.activity_stack.append(call_act)
-            self.calledFunctions.add(name)
-
-          
-            old_symbols = self.symbolTable.copy()
-            for param in self.functionParamNames.get(name, []):
-                self.symbolTable[param] = 'unknown'
-
-           
-            self.visit(declCtx)
-
-            
-            self.symbolTable    = old_symbols
-            self.activity_stack = prev_stack
+            self.inline_call(name, args)
+            inlined = True
+        if inlined:
             return None
 
        
-        for w in re.findall(r'(\w+)\s*\(', text):
-            if w not in self.functionDeclarations and w not in ['echo','array','isset']:
-                self.semantic_error(f"Funkcija '{w}()' nije deklarisana.")
-
-       
-        for v in re.findall(r'\$(\w+)', text):
-            if v not in self.symbolTable and '=' not in text:
+        for v in self.regex(re.findall, r'\$(\w+)', text):
+            if '=' not in text and not self.is_declared(v):
                 self.semantic_error(
                     f"Varijabla ${v} korišćena bez deklaracije u '{text}'"
                 )
 
       
-        self.add_activity({ "type": "stmt", "code": text })
+        self.add_activity({ "type": "stmt", "span": self.span_of(ctx) })
         return self.visitChildren(ctx)
 
     def visitIfStatement(self, ctx: PhpParser.IfStatementContext):
-        block = { "type": "if", "code": ctx.getText(), "children": [] }
+        block = { "type": "if", "children": [] }
         self.add_activity(block)
         self.activity_stack.append(block)
 
        
-        cond_match = re.search(r'if\s*\((.*?)\)', ctx.getText(), re.DOTALL)
-        if cond_match:
-            self.check_vars_in_expr(cond_match.group(1))
-
-        
-        for substmt in ctx.statement():
-            try:
-                stmts = substmt.blockStatement().statement()
-            except AttributeError:
-                stmts = [substmt]
-
-            for stmt in stmts:
-                self.visit(stmt)
-               
-                if block["children"] and block["children"][-1]["type"] == "break":
-                    break
+        self.check_vars_in_expr(self.text_of(ctx.expression(0)))
+
+        # svaka grana je posebno dijete: if, elseif..., else
+        conds = ctx.expression()
+        for idx, substmt in enumerate(ctx.statement()):
+            if idx < len(conds):
+                branch = {
+                    "type": "branch",
+                    "kind": "if" if idx == 0 else "elseif",
+                    "cond_span": self.span_of(conds[idx]),
+                    "children": []
+                }
+            else:
+                branch = { "type": "branch", "kind": "else", "children": [] }
+            self.add_activity(branch)
+            self.activity_stack.append(branch)
+            self.visit_until_break(self.body_statements(substmt), branch)
+            self.activity_stack.pop()
 
         self.activity_stack.pop()
         return None
 
+    def body_statements(self, stmt):
+        block = stmt.blockStatement()
+        if block is None:
+            return [stmt]
+        return block.innerStatementList().innerStatement()
+
+    def visit_until_break(self, stmts, block):
+        for stmt in stmts:
+            self.visit(stmt)
+            if block["children"] and block["children"][-1]["type"] == "break":
+                break
+
+    def visitEchoStatement(self, ctx: PhpParser.EchoStatementContext):
+        return self.add_statement(ctx)
+
+    def visitReturnStatement(self, ctx: PhpParser.ReturnStatementContext):
+        return self.add_statement(ctx)
+
+    def visitUnsetStatement(self, ctx: PhpParser.UnsetStatementContext):
+        return self.add_statement(ctx)
+
+    def add_statement(self, ctx):
+        # naredba bez posebne analize, ali vidljiva u dijagramu
+        self.add_activity({ "type": "stmt", "span": self.span_of(ctx) })
+        return None
+
 
     def visitWhileStatement(self, ctx: PhpParser.WhileStatementContext):
-        block = { "type": "while", "code": ctx.getText(), "children": [] }
+        cond  = self.text_of(ctx.expression())
+        block = { "type": "while", "cond_span": self.span_of(ctx.expression()), "children": [] }
         self.add_activity(block)
         self.activity_stack.append(block)
 
-        cond = re.search(r'while\s*\((.*?)\)', ctx.getText(), re.DOTALL).group(1)
         self.check_vars_in_expr(cond)
 
         self.visitChildren(ctx)
         self.activity_stack.pop()
+        self.keep_flat_body(block, ctx)
         return None
 
     def visitForStatement(self, ctx: PhpParser.ForStatementContext):
-        block = { "type": "for", "code": ctx.getText(), "children": [] }
+        cond = self.text_of(ctx.expression())
+        step = self.text_of(ctx.forUpdate())
+        block = {
+            "type": "for",
+            "cond_span": self.span_between(ctx.OpenParen(), ctx.CloseParen()),
+            "children": []
+        }
         self.add_activity(block)
         self.activity_stack.append(block)
 
-       
-        init, cond, step = re.findall(
-            r'for\s*\((.*?);(.*?);(.*?)\)', ctx.getText(), re.DOTALL
-        )[0]
-
       
-        m = re.match(r'\s*\$(\w+)\s*=\s*(.+)', init.strip())
-        if m:
-            varName, value = m.group(1), m.group(2)
-            if value.startswith(('"', "'")):
-                t = 'string'
-            elif re.match(r'^[\d\.]+$', value):
-                t = 'number'
-            elif value.startswith(('array(', '[')):
-                t = 'array'
-            else:
-                t = 'unknown'
-            self.symbolTable[varName] = t
-            print(f"[INFO] For-petlja deklarirala varijablu ${varName} tipa {t}")
+        if ctx.forInit():
+            declared = self.declare_from_assignment(
+                self.text_of(ctx.forInit().expressionList().expression(0))
+            )
+            if declared:
+                self.report(f"[INFO] For-petlja deklarirala varijablu ${declared[0]} tipa {declared[1]}")
 
         
         self.check_vars_in_expr(cond)
         self.check_vars_in_expr(step)
 
-      
-        body_stmt = ctx.statement()
-
-        try:
-            inner_stmts = body_stmt.blockStatement().statement()
-        except AttributeError:
-            inner_stmts = [body_stmt]
-
-        for stmt in inner_stmts:
-            self.visit(stmt)
-            if block["children"] and block["children"][-1]["type"] == "break":
-                break
-
+        # naredbe iza break-a se ne izvršavaju
+        self.visit_until_break(self.body_statements(ctx.statement()), block)
         self.activity_stack.pop()
+        self.keep_flat_body(block, ctx)
         return None
 
     def visitForeachStatement(self, ctx: PhpParser.ForeachStatementContext):
-        block = { "type": "foreach", "code": ctx.getText(), "children": [] }
+        parts = [self.text_of(e) for e in ctx.expression()]
+        block = {
+            "type": "foreach",
+            "cond_span": self.span_between(ctx.OpenParen(), ctx.CloseParen()),
+            "children": []
+        }
         self.add_activity(block)
         self.activity_stack.append(block)
 
     
-        m = re.search(r'foreach\s*\(\s*\$(\w+)\s+as\s+\$(\w+)\s*\)', ctx.getText())
-        if m:
-            list_var, item_var = m.group(1), m.group(2)
-            if list_var not in self.symbolTable:
-                self.semantic_error(
-                    f"Varijabla ${list_var} korišćena bez deklaracije u foreach"
-                )
-            self.symbolTable[item_var] = 'unknown'
+        list_m = self.regex(re.fullmatch, r'\$(\w+)', parts[0])
+        if list_m and not self.is_declared(list_m.group(1)):
+            self.semantic_error(
+                f"Varijabla ${list_m.group(1)} korišćena bez deklaracije u foreach"
+            )
+        for item in parts[1:]:
+            item_m = self.regex(re.fullmatch, r'\$(\w+)', item)
+            if item_m:
+                self.symbolTable[item_m.group(1)] = 'unknown'
 
         self.visitChildren(ctx)
         self.activity_stack.pop()
+        self.keep_flat_body(block, ctx)
         return None
 
     def visitDoWhileStatement(self, ctx: PhpParser.DoWhileStatementContext):
-        block = { "type": "do-while", "code": ctx.getText(), "children": [] }
+        cond  = self.text_of(ctx.expression())
+        block = { "type": "do-while", "cond_span": self.span_of(ctx.expression()), "children": [] }
         self.add_activity(block)
         self.activity_stack.append(block)
 
-        cond = re.search(r'do.*?while\s*\((.*?)\)', ctx.getText(), re.DOTALL).group(1)
         self.check_vars_in_expr(cond)
 
         self.visitChildren(ctx)
         self.activity_stack.pop()
+        self.keep_flat_body(block, ctx)
         return None
 
     def visitSwitchStatement(self, ctx: PhpParser.SwitchStatementContext):
-        block = { "type": "switch", "code": ctx.getText(), "children": [] }
+        block = { "type": "switch", "cond_span": self.span_of(ctx.expression()), "children": [] }
         self.add_activity(block)
         self.activity_stack.append(block)
 
-        cond = re.search(r'switch\s*\((.*?)\)', ctx.getText(), re.DOTALL).group(1)
+        cond = self.text_of(ctx.expression())
         self.check_vars_in_expr(cond)
 
-        self.visitChildren(ctx)
+        # case/default grane kao djeca, svaka sa svojim naredbama
+        for switch_block in ctx.switchBlock():
+            if switch_block.expression() is not None:
+                case = {
+                    "type": "case",
+                    "cond_span": self.span_of(switch_block.expression()),
+                    "children": []
+                }
+            else:
+                case = { "type": "default", "children": [] }
+            self.add_activity(case)
+            self.activity_stack.append(case)
+            self.visit_until_break(switch_block.innerStatementList().innerStatement(), case)
+            self.activity_stack.pop()
+
         self.activity_stack.pop()
         return None
 
+    def keep_flat_body(self, block, ctx):
+        # Petlja bez ugniježđenih aktivnosti: prazna, ili samo naredbe za koje
+        # visitor ne pravi aktivnost (throw, goto, declare, deklaracije klasa).
+        # Generator tada crta tijelo iz teksta, pa samo tada čuvamo kod petlje.
+        if not block["children"]:
+            block["span"] = self.span_of(ctx)
+
+    def call_sites(self, expr):
+        # Pozivi funkcija su primaryExpression čvorovi oblika id '(' ... ')'.
+        # Vraćaju se redom izvršavanja: argumenti prije samog poziva.
+        calls = []
+        stack = [(expr, False)]
+        while stack:
+            node, done = stack.pop()
+            if done:
+                calls.append(node)
+                continue
+            if isinstance(node, PhpParser.PrimaryExpressionContext) \
+                    and node.OpenParen() is not None and node.id_() is not None:
+                stack.append((node, True))
+            for child in reversed(node.children or []):
+                if isinstance(child, ParserRuleContext):
+                    stack.append((child, False))
+        return calls
+
+    def inline_call(self, name, args):
+        declCtx = self.functionDeclarations[name]
+        self.calledFunctions.add(name)
+        for frame in self.summary_frames:
+            frame["called"].add(name)
+
+        if not self.inline_calls:
+            self.add_activity({ "type": "call_ref", "code": f"poziv → {name}({args})", "target": name })
+            return
+
+        limit = self.inline_limit(name)
+        if limit is not None:
+            self.add_call_reference(name, args, limit)
+            return
+
+        # Tijelo je već obiđeno u istom kontekstu -> dijelimo isto podstablo
+        summary = self.find_summary(name)
+        if summary is not None and self.inline_nodes + summary["size"] > self.max_inline_nodes:
+            self.add_call_reference(name, args, ("budget_limited", "poziv (prekoračen budžet čvorova)"))
+            return
+
+        call_act   = {
+            "type": "call",
+            "code": f"{name}({args})",
+            "children": []
+        }
+        nodes_before = self.inline_nodes
+        self.add_activity(call_act)
+        if self.counters is not None:
+            self.counters.count_inline(name, len(self.inline_path) + 1, summary is not None)
+        if summary is not None:
+            call_act["children"] = summary["children"]
+            self.replay_summary(summary)
+            return
+
+        prev_stack = self.activity_stack.copy()
+        self.activity_stack.append(call_act)
+
+      
+        old_symbols = self.symbolTable.copy()
+        for param in self.functionParamNames.get(name, []):
+            self.symbolTable[param] = 'unknown'
+
+        frame = {
+            "entry":       old_symbols,
+            "deps":        {},
+            "findings":    [],
+            "called":      set(),
+            "nodes_start": self.inline_nodes,
+            "depth":       1,
+            "limited":     False,
+            "truncated":   False,
+            "stats_start": {k: self.inline_stats[k]
+                            for k in ("recursive_refs", "depth_limited", "budget_limited")},
+        }
+        self.summary_frames.append(frame)
+        self.inline_path.append(name)
+        self.inline_stats["max_depth"] = max(self.inline_stats["max_depth"], len(self.inline_path))
+        try:
+            self.visit(declCtx)
+        except RecursionError:
+            # tijelo je preduboko i uz rezervu okvira: umjesto napola
+            # obiđenog tijela ostaje referenca, kao preko max_inline_depth
+            overflow = True
+        else:
+            overflow = False
+        finally:
+            self.inline_path.pop()
+            self.summary_frames.pop()
+            self.symbolTable    = old_symbols
+            self.activity_stack = prev_stack
+
+        if overflow:
+            siblings = self.activity_stack[-1]["children"] if self.activity_stack else self.activities
+            siblings.remove(call_act)
+            self.inline_nodes = nodes_before
+            self.add_call_reference(name, args, ("depth_limited", "poziv (prekoračena dubina inlininga)"))
+            return
+
+        if self.summary_frames:
+            parent = self.summary_frames[-1]
+            parent["depth"] = max(parent["depth"], frame["depth"] + 1)
+
+        # obilazak presječen budžetom čvorova ne pamtimo
+        if not frame["truncated"]:
+            self.store_summary(name, frame, call_act["children"])
+
     def check_vars_in_expr(self, expr_text):
-        for v in re.findall(r'\$(\w+)', expr_text):
-            if v not in self.symbolTable:
+        for v in self.regex(re.findall, r'\$(\w+)', expr_text):
+            if not self.is_declared(v):
                 self.semantic_error(
                     f"Varijabla ${v} korišćena bez prethodne deklaracije u '{expr_text}'"
                 )
@@ -277,3 +602,12 @@ class MyVisitor(PhpParserVisitor):
         if ctx.__class__.__name__ == "FunctionDeclarationContext":
             return None
         return self.visitChildren(ctx)
+
+def stack_depth():
+    # broj Python okvira na steku pozivaoca
+    depth = 0
+    frame = sys._getframe(1)
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
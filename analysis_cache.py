@@ -0,0 +1,107 @@
+import os
+import json
+import hashlib
+import tempfile
+from functools import lru_cache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.environ.get("PHP_ANALYZER_CACHE", os.path.join(BASE_DIR, ".analyzer_cache"))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Fajlovi od kojih zavisi rezultat analize - promjena bilo kojeg poništava keš.
+FINGERPRINT_FILES = (
+    "PhpParser.g4",
+    "PhpLexer.g4",
+    "MyVisitor.py",
+    "Generate_Uml_Activity.py",
+)
+
+@lru_cache(maxsize=None)
+def tool_fingerprint():
+    h = hashlib.sha256()
+    for name in FINGERPRINT_FILES:
+        h.update(name.encode("utf-8"))
+        try:
+            with open(os.path.join(BASE_DIR, name), "rb") as f:
+                h.update(f.read())
+        except FileNotFoundError:
+            h.update(b"<missing>")
+    return h.hexdigest()
+
+class AnalysisCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key_for(self, source_bytes, options=""):
+        h = hashlib.sha256(tool_fingerprint().encode("ascii"))
+        h.update(options.encode("utf-8"))
+        h.update(b"\0")
+        h.update(source_bytes)
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            # nema unosa, ili ga je drugi proces upravo izbacio/prepisao
+            return None
+        try:
+            os.utime(path)          # LRU: mtime = vrijeme posljednjeg korištenja
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, activities, uml, extra=None):
+        path = self._path(key)
+        # Atomski upis: temp fajl u istom direktoriju + os.replace, tako da
+        # paralelni workeri nikad ne vide napola upisan unos. Keš je samo
+        # ubrzanje - greška pri upisu ne smije oboriti analizu.
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                entry = {"activities": activities, "uml": uml}
+                entry.update(extra or {})
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, path)
+            return True
+        except OSError:
+            if tmp:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+            return False
+
+    def prune(self):
+        entries = []
+        total = 0
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return removed
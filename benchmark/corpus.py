@@ -0,0 +1,114 @@
+import os
+import sys
+import argparse
+
+# Generator sintetičkih PHP fajlova za benchmark. Koriste se samo konstrukcije
+# koje PhpParser.g4 prihvata i koje MyVisitor zna obraditi.
+#   length        - broj naredbi u glavnom dijelu skripte
+#   depth         - dubina ugniježđenih if/for/while blokova (svaka 10. naredba)
+#   switch_cases  - broj case grana u switch naredbi
+#   functions     - broj pomoćnih funkcija (svaka se poziva jednom)
+#   fanout        - koliko funkcija sljedećeg nivoa poziva svaka funkcija u stablu poziva
+#   call_depth    - broj nivoa stabla poziva
+DEFAULTS = {
+    "length": 200,
+    "depth": 4,
+    "switch_cases": 20,
+    "functions": 10,
+    "fanout": 2,
+    "call_depth": 3,
+}
+
+def _nested(depth, n, indent):
+    pad = "    " * indent
+    if depth == 0:
+        return [f"{pad}$v{n} = $v{n} + 1;"]
+    kind = depth % 3
+    inner = _nested(depth - 1, n, indent + 1)
+    if kind == 0:
+        head, tail = f"if ($v{n} > {depth}) {{", "} else {"
+        return ([pad + head] + inner + [pad + tail, f"{pad}    $v{n} = {depth};", pad + "}"])
+    if kind == 1:
+        var = f"$i{depth}"
+        head = f"for ({var} = 0; {var} < {depth}; {var}++) {{"
+    else:
+        head = f"while ($v{n} < {depth * 10}) {{"
+    return [pad + head] + inner + [pad + "}"]
+
+def _switch(cases):
+    lines = ["switch ($x) {"]
+    for i in range(cases):
+        lines += [f"    case {i}:", f"        $r = {i};", "        break;"]
+    lines += ["    default:", "        $r = -1;", "}"]
+    return lines
+
+def generate_php(length=None, depth=None, switch_cases=None, functions=None,
+                 fanout=None, call_depth=None):
+    p = dict(DEFAULTS)
+    p.update((k, v) for k, v in {
+        "length": length, "depth": depth, "switch_cases": switch_cases,
+        "functions": functions, "fanout": fanout, "call_depth": call_depth,
+    }.items() if v is not None)
+
+    lines = ["<?php"]
+    for i in range(p["functions"]):
+        lines += [
+            f"function f{i}($a, $b) {{",
+            "    $c = $a + $b;",
+            "    if ($c > 10) {",
+            "        $c = $c - 10;",
+            "    }",
+            "    return $c;",
+            "}",
+        ]
+    for level in range(p["call_depth"]):
+        for j in range(p["fanout"]):
+            lines.append(f"function t{level}_{j}($a) {{")
+            lines.append("    $a = $a + 1;")
+            if level + 1 < p["call_depth"]:
+                lines += [f"    t{level + 1}_{k}($a);" for k in range(p["fanout"])]
+            lines.append("}")
+
+    lines += ["$x = 1;", "$r = 0;"]
+    for i in range(p["length"]):
+        kind = i % 10
+        if kind == 9 and p["depth"]:
+            lines.append(f"$v{i} = 0;")
+            lines += _nested(p["depth"], i, 0)
+        elif kind in (0, 4):
+            lines.append(f"$x = $x + {i};")
+        elif kind == 1:
+            lines.append("echo $x;")
+        elif kind == 2:
+            lines += [f"if ($x > {i}) {{", f"    $r = {i};", "} else {", "    $r = 0;", "}"]
+        elif kind == 3 and p["functions"]:
+            lines.append(f"$x = f{(i // 10) % p['functions']}($x, {i});")
+        else:
+            lines.append(f"$y{i % 7} = $x * 2;")
+    lines += [f"f{i}($x, $r);" for i in range(p["functions"])]
+    if p["call_depth"] and p["fanout"]:
+        lines.append("t0_0($x);")
+    if p["switch_cases"]:
+        lines += _switch(p["switch_cases"])
+    lines.append("?>")
+    return "\n".join(lines) + "\n"
+
+def write_php(path, **knobs):
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(generate_php(**knobs))
+    return path
+
+def parse_args(argv):
+    ap = argparse.ArgumentParser(description="Generisanje sintetičkog PHP fajla za benchmark.")
+    ap.add_argument("output", help="izlazni .php fajl")
+    for name, value in DEFAULTS.items():
+        ap.add_argument("--" + name.replace("_", "-"), type=int, default=value, dest=name,
+                        help=f"(default: {value})")
+    return ap.parse_args(argv)
+
+if __name__ == "__main__":
+    args = vars(parse_args(sys.argv[1:]))
+    out = args.pop("output")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    write_php(out, **args)
+    print(f"Generisan {out}")
@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import platform
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmark.corpus import write_php
+from benchmark.run_benchmark import run_once
+
+# Fiksni korpus za poređenje sa baseline-om: ime -> parametri generatora.
+CORPUS = {
+    "osnovni":  {},
+    "dugi":     {"length": 800},
+    "duboki":   {"length": 100, "depth": 24},
+    "switch":   {"length": 20, "switch_cases": 800},
+    "funkcije": {"length": 100, "functions": 150},
+    "pozivi":   {"length": 20, "fanout": 16, "call_depth": 3},
+}
+# faze koje se porede i gdje se troši njihovo vrijeme
+STAGES = {
+    "lex":      "PhpLexer",
+    "parse":    "PhpParser.phpBlock",
+    "visit":    "MyVisitor",
+    "generate": "generate_activity_uml",
+}
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TOLERANCE = 0.25
+# p95 iz malog broja mjerenja je bučniji od medijana
+P95_TOLERANCE = 0.50
+MEMORY_TOLERANCE = 0.10
+# razlika manja od NOISE_FACTOR * MAD (bilo kojeg mjerenja) se smatra šumom
+NOISE_FACTOR = 3
+
+def percentile(values, p):
+    # nearest-rank
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, -(-len(ordered) * p // 100) - 1))
+    return ordered[int(k)]
+
+def summarize(samples):
+    med = statistics.median(samples)
+    mad = statistics.median(abs(x - med) for x in samples)
+    return {"median": med, "p95": percentile(samples, 95), "mad": mad,
+            "noise": mad / med if med else 0.0, "samples": samples}
+
+def peak_memory(php_file):
+    tracemalloc.start()
+    try:
+        run_once(php_file)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def measure(repeat=7, warmup=1):
+    cases = {}
+    with tempfile.TemporaryDirectory(prefix="php_regress_") as workdir:
+        files = {name: write_php(os.path.join(workdir, f"{name}.php"), **knobs)
+                 for name, knobs in CORPUS.items()}
+        # prvi prolaz puni DFA keš parsera; mjeri se "toplo" stanje
+        for _ in range(warmup):
+            for php_file in files.values():
+                run_once(php_file)
+        # fajlovi se smjenjuju u svakom krugu, pa kratkotrajno opterećenje
+        # mašine pogodi sve slučajeve podjednako umjesto jednog
+        records = {name: [] for name in files}
+        for _ in range(repeat):
+            for name, php_file in files.items():
+                records[name].append(run_once(php_file))
+        for name, php_file in files.items():
+            stages = {s: summarize([r["stages"][s]["wall"] for r in records[name]]) for s in STAGES}
+            cases[name] = {"knobs": CORPUS[name], "counts": records[name][0]["counts"],
+                           "stages": stages, "peak_memory": peak_memory(php_file)}
+    return {"python": platform.python_version(), "machine": platform.machine(),
+            "repeat": repeat, "cases": cases}
+
+def regressed(base, new, key, tolerance):
+    # sporije preko tolerancije i preko šuma oba mjerenja
+    noise = NOISE_FACTOR * max(base["mad"], new["mad"])
+    return new[key] > base[key] * (1 + tolerance) and new[key] - base[key] > noise
+
+def compare(baseline, current, tolerance=TOLERANCE, memory_tolerance=MEMORY_TOLERANCE,
+            p95_tolerance=P95_TOLERANCE):
+    rows = []
+    failures = []
+    for name, case in current["cases"].items():
+        base_case = baseline["cases"].get(name)
+        if base_case is None:
+            rows.append((name, "-", "nema u baseline-u", ""))
+            continue
+        for stage, label in STAGES.items():
+            b, n = base_case["stages"][stage], case["stages"][stage]
+            bad = []
+            if regressed(b, n, "median", tolerance):
+                bad.append("medijan")
+            if regressed(b, n, "p95", p95_tolerance):
+                bad.append("p95")
+            status = "REGRESIJA (" + ", ".join(bad) + ")" if bad else "ok"
+            if n["noise"] > tolerance:
+                status += " [šum]"
+            rows.append((name, label,
+                         f"{1000 * b['median']:8.1f} {1000 * n['median']:8.1f} {_delta(b['median'], n['median'])} "
+                         f"{1000 * b['p95']:8.1f} {1000 * n['p95']:8.1f} {100 * n['noise']:5.1f}%",
+                         status))
+            if bad:
+                failures.append((name, label, bad))
+        b, n = base_case["peak_memory"], case["peak_memory"]
+        bad = n > b * (1 + memory_tolerance)
+        rows.append((name, "peak memorija",
+                     f"{b / 1024:7.0f}K {n / 1024:7.0f}K {_delta(b, n)}", "REGRESIJA" if bad else "ok"))
+        if bad:
+            failures.append((name, "peak memorija", ["peak"]))
+    return rows, failures
+
+def _delta(old, new):
+    return f"{100 * (new - old) / old:+6.1f}%" if old else "     -"
+
+def format_rows(rows):
+    lines = [f"{'KORPUS':<10} {'FAZA':<22} {'BASE MED':>8} {'NOVI MED':>8} {'Δ':>7} "
+             f"{'BASE P95':>8} {'NOVI P95':>8} {'ŠUM':>6}  STATUS",
+             "-" * 100]
+    for name, label, numbers, status in rows:
+        lines.append(f"{name:<10} {label:<22} {numbers}  {status}")
+    return "\n".join(lines)
+
+def parse_args(argv):
+    ap = argparse.ArgumentParser(
+        description="Provjera regresija performansi: fiksni korpus kroz lekser/parser/visitor/"
+                    "generisanje, poređenje sa sačuvanim baseline-om."
+    )
+    ap.add_argument("--baseline", default=BASELINE,
+                    help="baseline JSON (default: benchmark/baseline.json)")
+    ap.add_argument("--update-baseline", action="store_true",
+                    help="izmjeri i prepiši baseline umjesto poređenja")
+    ap.add_argument("--repeat", type=int, default=7,
+                    help="broj mjerenja po fajlu (default: 7)")
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE,
+                    help=f"dozvoljeno usporenje, relativno (default: {TOLERANCE})")
+    ap.add_argument("--p95-tolerance", type=float, default=P95_TOLERANCE,
+                    help=f"dozvoljeno usporenje p95, relativno (default: {P95_TOLERANCE})")
+    ap.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE,
+                    help=f"dozvoljeni rast peak memorije, relativno (default: {MEMORY_TOLERANCE})")
+    ap.add_argument("--json", default=None, metavar="FAJL",
+                    help="sačuvaj trenutna mjerenja u JSON")
+    return ap.parse_args(argv)
+
+def main(argv):
+    args = parse_args(argv)
+    current = measure(args.repeat)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=1)
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8", newline="\n") as f:
+            json.dump(current, f, ensure_ascii=False, indent=1)
+            f.write("\n")
+        print(f"Baseline sačuvan u {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except OSError:
+        print(f"Baseline {args.baseline} ne postoji. Pokreni sa --update-baseline.")
+        return 2
+    if baseline.get("python") != current["python"]:
+        print(f"[UPOZORENJE] baseline je sniman na Pythonu {baseline.get('python')}, "
+              f"trenutno {current['python']}")
+
+    rows, failures = compare(baseline, current, args.tolerance, args.memory_tolerance,
+                               args.p95_tolerance)
+    print(format_rows(rows))
+    if failures:
+        print(f"\nRegresija u {len(failures)} mjerenja (tolerancija {100 * args.tolerance:.0f}%, "
+              f"memorija {100 * args.memory_tolerance:.0f}%).")
+        return 1
+    print("\nBez regresija.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,162 @@
+import os
+import gc
+import sys
+import json
+import math
+import argparse
+import tempfile
+import statistics
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmark.corpus import write_php
+from profiling import stage, start_profile, stop_profile
+from run_analyzer import analyze_file, render_png
+from Generate_Uml_Activity import generate_activity_uml
+from uml_output import atomic_write
+
+# Svaka serija mijenja jedan parametar generatora, ostali su mali (BASE), pa
+# vrijeme zavisi uglavnom od tog parametra. knob -> (veličine, izmjene BASE)
+BASE = {"length": 20, "depth": 2, "switch_cases": 5, "functions": 2, "fanout": 2, "call_depth": 2}
+SWEEPS = {
+    "length":       ([250, 500, 1000, 2000], {}),
+    "depth":        ([8, 16, 24, 32], {"length": 100}),
+    "switch_cases": ([250, 500, 1000, 2000], {}),
+    "functions":    ([50, 100, 200, 400], {}),
+    "fanout":       ([4, 8, 16, 32], {"call_depth": 3}),
+}
+# Eksponent se računa u odnosu na ulaz faze: lekser prema broju znakova,
+# parser prema broju tokena, visitor prema čvorovima stabla parsiranja plus
+# nastalim aktivnostima (inlining), generisanje prema broju aktivnosti.
+STAGE_SIZE = {"lex": ("chars",), "parse": ("tokens",), "visit": ("parse_nodes", "activities"),
+              "generate": ("activities",), "render": ("activities",), "total": ("chars",)}
+MAX_EXPONENT = 1.5
+# faze kraće od ovoga i na najvećem ulazu se ne označavaju (šum mjerenja)
+MIN_SECONDS = 0.01
+
+def run_once(php_file, render=False):
+    gc.collect()
+    start_profile(php_file)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        result = analyze_file(php_file)
+    with stage("generate"):
+        uml_code = generate_activity_uml(result["activities"], result["source"])
+    if render:
+        uml_file = os.path.splitext(php_file)[0] + ".uml"
+        atomic_write(uml_file, uml_code)
+        with stage("render"):
+            render_png(uml_file, "pipe", uml_code)
+    record = stop_profile()
+    record["counts"]["chars"] = len(result["source"])
+    record["stages"]["total"] = {
+        "wall": sum(v["wall"] for v in record["stages"].values()),
+        "cpu": sum(v["cpu"] for v in record["stages"].values()),
+    }
+    return record
+
+def scaling_exponent(xs, ys):
+    # nagib pravca najmanjih kvadrata u log-log prostoru: t ~ n^k
+    pts = [(math.log(x), math.log(y)) for x, y in zip(xs, ys) if x > 0 and y > 0]
+    if len(pts) < 2:
+        return None
+    mx = sum(p[0] for p in pts) / len(pts)
+    my = sum(p[1] for p in pts) / len(pts)
+    var = sum((p[0] - mx) ** 2 for p in pts)
+    if var == 0:
+        return None
+    return sum((p[0] - mx) * (p[1] - my) for p in pts) / var
+
+def run_sweep(knob, sizes, workdir, repeat=3, render=False):
+    points = []
+    for size in sizes:
+        knobs = dict(BASE, **SWEEPS[knob][1])
+        knobs[knob] = size
+        php_file = write_php(os.path.join(workdir, f"{knob}_{size}.php"), **knobs)
+        records = [run_once(php_file, render) for _ in range(repeat)]
+        stages = {}
+        for r in records:
+            for name, v in r["stages"].items():
+                stages.setdefault(name, []).append(v["wall"])
+        points.append({"size": size, "knobs": knobs, "counts": records[0]["counts"],
+                       "samples": stages,
+                       "median": {k: statistics.median(v) for k, v in stages.items()}})
+
+    exponents = {}
+    for name in points[0]["median"]:
+        if name not in STAGE_SIZE:
+            continue
+        xs = [sum(p["counts"].get(c, 0) for c in STAGE_SIZE[name]) for p in points]
+        exponents[name] = scaling_exponent(xs, [p["median"].get(name, 0) for p in points])
+    return {"knob": knob, "points": points, "exponents": exponents}
+
+def format_sweep(sweep, max_exponent=MAX_EXPONENT):
+    stages = list(sweep["points"][0]["median"])
+    lines = [f"\n== {sweep['knob']}",
+             f"{'VELIČINA':>8} {'TOKENA':>8} {'AKTIVN.':>8} " + " ".join(f"{s:>9}" for s in stages)]
+    for p in sweep["points"]:
+        lines.append(f"{p['size']:>8} {p['counts'].get('tokens', 0):>8} "
+                     f"{p['counts'].get('activities', 0):>8} "
+                     + " ".join(f"{1000 * p['median'][s]:>7.1f}ms" for s in stages))
+    cells = []
+    for s in stages:
+        k = sweep["exponents"].get(s)
+        if k is None:
+            cells.append(f"{'-':>9}")
+        else:
+            cells.append(f"{k:>8.2f}" + ("!" if k > max_exponent else " "))
+    lines.append(f"{'eksponent':>26} " + " ".join(cells))
+    return "\n".join(lines)
+
+def flagged(sweeps, max_exponent=MAX_EXPONENT):
+    return [(s["knob"], name, k) for s in sweeps for name, k in s["exponents"].items()
+            if k is not None and k > max_exponent
+            and s["points"][-1]["median"][name] >= MIN_SECONDS]
+
+def parse_args(argv):
+    ap = argparse.ArgumentParser(
+        description="Benchmark skaliranja: sintetički PHP fajlovi rastuće veličine, "
+                    "vrijeme po fazama i eksponent rasta."
+    )
+    ap.add_argument("--knob", nargs="+", choices=sorted(SWEEPS), default=None,
+                    help="parametri koji se mijenjaju (default: svi)")
+    ap.add_argument("--sizes", nargs="+", type=int, default=None,
+                    help="vrijednosti parametra (samo uz jedan --knob)")
+    ap.add_argument("--repeat", type=int, default=3,
+                    help="broj ponavljanja po veličini, uzima se medijan (default: 3)")
+    ap.add_argument("--render", action="store_true",
+                    help="mjeri i renderovanje PNG-a preko PlantUML-a")
+    ap.add_argument("--max-exponent", type=float, default=MAX_EXPONENT,
+                    help=f"eksponent iznad kojeg se faza označava kao regresija (default: {MAX_EXPONENT})")
+    ap.add_argument("--json", default=None, metavar="FAJL",
+                    help="sačuvaj sve uzorke i eksponente u JSON")
+    return ap.parse_args(argv)
+
+def main(argv):
+    args = parse_args(argv)
+    knobs = args.knob or list(SWEEPS)
+    if args.sizes and len(knobs) != 1:
+        print("--sizes se može koristiti samo sa jednim --knob parametrom.")
+        return 2
+
+    sweeps = []
+    with tempfile.TemporaryDirectory(prefix="php_bench_") as workdir:
+        for knob in knobs:
+            sweep = run_sweep(knob, args.sizes or SWEEPS[knob][0], workdir, args.repeat, args.render)
+            print(format_sweep(sweep, args.max_exponent))
+            sweeps.append(sweep)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"repeat": args.repeat, "sweeps": sweeps}, f, ensure_ascii=False, indent=1)
+
+    bad = flagged(sweeps, args.max_exponent)
+    for knob, name, k in bad:
+        print(f"[UPOZORENJE] {knob}: faza '{name}' raste kao n^{k:.2f} "
+              f"(prag {args.max_exponent}) - moguća kvadratna regresija")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,23 @@
+import json
+from Generate_Uml_Activity import generate_activity_uml, with_code
+from Generate_Svg_Activity import generate_activity_dot, generate_activity_svg
+from Generate_Mermaid_Activity import generate_activity_mermaid
+
+# Izlazni formati: svi se prave iz istog stabla aktivnosti (MyVisitor), pa
+# jedan prolaz leksera/parsera daje sve tražene formate.
+# ime -> {"ext": ekstenzija fajla,
+#         "generate": f(activities, source, link_prefix=None) -> str}
+FORMATS = {}
+
+def register_format(name, ext, generate):
+    FORMATS[name] = {"ext": ext, "generate": generate}
+
+def generate_activity_json(activities, source=None, link_prefix=None):
+    # reference su već u stablu (target, part), link_prefix nije potreban
+    return json.dumps({"activities": with_code(activities, source)}, ensure_ascii=False, indent=1)
+
+register_format("plantuml", ".uml",  generate_activity_uml)
+register_format("svg",      ".svg",  generate_activity_svg)
+register_format("dot",      ".dot",  generate_activity_dot)
+register_format("mermaid",  ".mmd",  generate_activity_mermaid)
+register_format("json",     ".json", generate_activity_json)
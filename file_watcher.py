@@ -0,0 +1,32 @@
+import os
+import time
+
+def snapshot(paths):
+    state = {}
+    for p in paths:
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        state[p] = (st.st_mtime_ns, st.st_size)
+    return state
+
+def watch_files(list_files, interval=0.5, debounce=0.3):
+    # Polling: svakih `interval` sekundi uporedi mtime/veličinu svih fajlova.
+    # Nakon prve promjene čeka da se stanje smiri `debounce` sekundi, tako da
+    # nalet snimanja (editor, git checkout) daje jednu grupu promjena.
+    prev = {}
+    while True:
+        cur = snapshot(list_files())
+        changed = {p for p, sig in cur.items() if prev.get(p) != sig}
+        if changed:
+            while True:
+                time.sleep(debounce)
+                again = snapshot(list_files())
+                if again == cur:
+                    break
+                changed.update(p for p, sig in again.items() if cur.get(p) != sig)
+                cur = again
+            yield sorted(p for p in changed if p in cur)
+        prev = cur
+        time.sleep(interval)
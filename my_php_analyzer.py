@@ -1,34 +1,94 @@
 import sys
 from antlr4 import *
 from PhpLexer import PhpLexer
-from PhpParser import PhpParser
 from MyVisitor import MyVisitor
-from StrictErrorListener import StrictErrorListener
+from visitor_counters import VisitorCounters, format_counters, write_counters
+from Generate_Uml_Activity import with_code
+from parse_driver import parse_php
+from profiling import (count, count_activities, count_tree_nodes, format_memory_report,
+                       format_profile_table, format_rule_report, parse_listeners, profiling,
+                       stage, start_profile, stop_profile, write_profile,
+                       save_cprofile, start_cprofile)
+
+def flag_value(argv, flag, default):
+    if flag not in argv[2:]:
+        return None
+    i = argv.index(flag, 2)
+    if i + 1 < len(argv) and not argv[i + 1].startswith("--"):
+        return argv[i + 1]
+    return default
 
 def main(argv):
-    input_stream = FileStream(argv[1], encoding="utf-8")
-    lexer = PhpLexer(input_stream)
-    token_stream = CommonTokenStream(lexer)
-    parser = PhpParser(token_stream)
-    parser.removeErrorListeners()
-    parser.addErrorListener(StrictErrorListener())
-    
-    tree = parser.phpBlock()
+    # python my_php_analyzer.py fajl.php [--profile [FAJL]] [--memprofile [FAJL]] [--rule-profile]
+    #                                    [--cprofile [PREFIKS]] [--visitor-counters [FAJL]]
+    profile = flag_value(argv, "--profile", "profile.jsonl")
+    memprofile = flag_value(argv, "--memprofile", "memprofile.jsonl")
+    rule_profile = "--rule-profile" in argv[2:]
+    visitor_counters = flag_value(argv, "--visitor-counters", "-")
+    if profile or memprofile or rule_profile:
+        start_profile(argv[1], memory=bool(memprofile), rules=rule_profile)
+
+    with stage("read"):
+        input_stream = FileStream(argv[1], encoding="utf-8")
+    with stage("lex"):
+        lexer = PhpLexer(input_stream)
+        token_stream = CommonTokenStream(lexer)
+        if profiling():
+            token_stream.fill()
+    count("tokens", len(token_stream.tokens))
+
+    with stage("parse"):
+        tree = parse_php(token_stream, parse_listeners())
+    if profiling():
+        count("parse_nodes", count_tree_nodes(tree))
+
 
-    
 
-    visitor = MyVisitor()
+    counters = VisitorCounters() if visitor_counters else None
+    visitor = MyVisitor(counters=counters)
 
     try:
-        visitor.visit(tree)
+        with stage("visit"):
+            visitor.visit(tree)
     except Exception as e:
         print(f"\nAnaliza prekinuta: {e}")
         sys.exit(1)
+    if profiling():
+        count("activities", count_activities(visitor.activities))
+
 
-    
     print("\nCollected Activities:")
-    for activity in visitor.activities:
+    for activity in with_code(visitor.activities, visitor.source):
         print(activity)
 
+    if profile or memprofile or rule_profile:
+        record = stop_profile()
+        if profile:
+            write_profile(profile, [record])
+            print(f"\nProfil ({profile}):")
+            print(format_profile_table([record]))
+        if memprofile:
+            write_profile(memprofile, [record])
+            print(f"\nProfil memorije ({memprofile}):")
+            print(format_memory_report([record]))
+        if rule_profile:
+            print("\nPravila gramatike po ekskluzivnom vremenu:")
+            print(format_rule_report([record]))
+
+    if counters is not None:
+        if visitor_counters == "-":
+            print("\nBrojači visitora:")
+            print(format_counters(counters.as_dict()))
+        else:
+            write_counters(visitor_counters, [{"file": argv[1], "counters": counters.as_dict()}])
+            print(f"\nBrojači visitora sačuvani u {visitor_counters}")
+
 if __name__ == '__main__':
-    main(sys.argv)
+    cprofile = flag_value(sys.argv, "--cprofile", "cprofile")
+    profiler = start_cprofile() if cprofile else None
+    try:
+        main(sys.argv)
+    finally:
+        if profiler is not None:
+            files = save_cprofile(cprofile, profiler)
+            print(f"cProfile: {files[0]}, {files[1]}")
@@ -0,0 +1,34 @@
+from antlr4 import *
+from antlr4.error.ErrorStrategy import DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+from PhpParser import PhpParser
+from StrictErrorListener import StrictErrorListener
+
+# Koliko puta je parsiranje prošlo u SLL modu, a koliko je trebalo ponoviti s LL.
+parse_stats = {"sll": 0, "ll_fallback": 0}
+
+def parse_php(token_stream, listeners=()):
+    parser = PhpParser(token_stream)
+    # parse listeneri (npr. profiling.RuleProfiler) ostaju i za LL prolaz
+    for listener in listeners:
+        parser.addParseListener(listener)
+
+    # 1) brzi prolaz: SLL predikcija, bez oporavka od grešaka
+    parser.removeErrorListeners()
+    parser._errHandler = BailErrorStrategy()
+    parser._interp.predictionMode = PredictionMode.SLL
+    try:
+        tree = parser.phpBlock()
+        parse_stats["sll"] += 1
+        return tree
+    except ParseCancellationException:
+        pass
+
+    # 2) SLL nije uspio (prava sintaksna greška ili SLL konflikt) -> puni LL
+    parse_stats["ll_fallback"] += 1
+    token_stream.seek(0)
+    parser.reset()
+    parser._errHandler = DefaultErrorStrategy()
+    parser._interp.predictionMode = PredictionMode.LL
+    parser.addErrorListener(StrictErrorListener())
+    return parser.phpBlock()
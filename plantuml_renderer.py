@@ -0,0 +1,168 @@
+import os
+import re
+import time
+import queue
+import atexit
+import threading
+import subprocess
+
+PLANTUML_JAR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jars", "plantuml.jar")
+PIPE_DELIMITER = "___PHP_ANALYZER_DIAGRAM_END___"
+RENDER_TIMEOUT = 60.0
+
+class RenderError(Exception):
+    pass
+
+class RenderTimeout(RenderError):
+    pass
+
+def render_with_subprocess(uml_file, jar=PLANTUML_JAR):
+    # stari način: jedan JVM po dijagramu
+    subprocess.run(["java", "-jar", jar, uml_file], check=True)
+    return os.path.splitext(uml_file)[0] + ".png"
+
+BATCH_CHUNK = 200      # fajlova po jednom pozivu (limit dužine komandne linije)
+
+def render_batch(uml_files, threads=None, jar=PLANTUML_JAR):
+    # Svi dijagrami u jednom (ili nekoliko) JVM poziva; PlantUML ih sam
+    # renderuje paralelno (-nbthread). Vraća {uml_file: poruka greške ili None}.
+    results = {}
+    threads = threads or os.cpu_count() or 1
+    for i in range(0, len(uml_files), BATCH_CHUNK):
+        chunk = uml_files[i:i + BATCH_CHUNK]
+        started = time.time()
+        proc = subprocess.run(
+            ["java", "-Djava.awt.headless=true", "-jar", jar,
+             "-nbthread", str(threads), "-charset", "UTF-8", "-tpng"] + chunk,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, encoding="utf-8", errors="replace",
+        )
+        failed = {}
+        for m in re.finditer(r'Error line (\d+) in file: (.+)', proc.stdout + proc.stderr):
+            failed[os.path.abspath(m.group(2).strip())] = f"PlantUML greška u liniji {m.group(1)}"
+
+        for uml_file in chunk:
+            png_file = os.path.splitext(uml_file)[0] + ".png"
+            if os.path.abspath(uml_file) in failed:
+                results[uml_file] = failed[os.path.abspath(uml_file)]
+            elif not os.path.exists(png_file) or os.path.getmtime(png_file) < started - 1:
+                results[uml_file] = f"PlantUML nije kreirao sliku (izlazni kod {proc.returncode})"
+            else:
+                results[uml_file] = None
+    return results
+
+class PlantUMLPipeRenderer:
+    # Jedan dugovječni PlantUML proces u -pipe modu: dijagrami se šalju na
+    # stdin, a slike se čitaju sa stdout-a do PIPE_DELIMITER linije.
+    def __init__(self, jar=PLANTUML_JAR, timeout=RENDER_TIMEOUT, fmt="png"):
+        self.jar = jar
+        self.timeout = timeout
+        self.fmt = fmt
+        self.proc = None
+        self.restarts = 0
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            ["java", "-Djava.awt.headless=true", "-jar", self.jar,
+             "-pipe", "-pipedelimitor", PIPE_DELIMITER,
+             f"-t{self.fmt}", "-charset", "UTF-8"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._chunks = queue.Queue()
+        self._buffer = bytearray()
+        # stdout se čita u posebnoj niti da bi timeout radio i na Windowsu
+        reader = threading.Thread(
+            target=self._pump, args=(self.proc.stdout, self._chunks), daemon=True
+        )
+        reader.start()
+
+    @staticmethod
+    def _pump(stream, chunks):
+        while True:
+            data = stream.read1(65536)
+            if not data:
+                chunks.put(None)
+                return
+            chunks.put(data)
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+    def kill(self):
+        if self.proc is None:
+            return
+        self.proc.kill()
+        self.proc.wait()
+        self.proc = None
+
+    def render(self, uml_text):
+        for attempt in range(2):
+            if self.proc is None or self.proc.poll() is not None:
+                self.start()
+            try:
+                return self._render_once(uml_text)
+            except RenderTimeout:
+                # zaglavljeni dijagram: ubij proces, sljedeći poziv ga ponovo pokreće
+                self.kill()
+                self.restarts += 1
+                raise
+            except (RenderError, OSError) as e:
+                self.kill()
+                self.restarts += 1
+                if attempt == 1:
+                    raise RenderError(f"PlantUML proces se srušio: {e}") from e
+        raise RenderError("PlantUML proces nije dostupan")
+
+    def _render_once(self, uml_text):
+        if not uml_text.endswith("\n"):
+            uml_text += "\n"
+        self.proc.stdin.write(uml_text.encode("utf-8"))
+        self.proc.stdin.flush()
+
+        marker = PIPE_DELIMITER.encode("ascii")
+        deadline = time.monotonic() + self.timeout
+        scanned = 0
+        while True:
+            pos = self._buffer.find(marker, max(0, scanned - len(marker)))
+            if pos >= 0:
+                break
+            scanned = len(self._buffer)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RenderTimeout(f"PlantUML nije završio dijagram za {self.timeout:.0f}s")
+            try:
+                chunk = self._chunks.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if chunk is None:
+                raise RenderError("PlantUML proces je zatvorio izlaz")
+            self._buffer += chunk
+
+        image = bytes(self._buffer[:pos])
+        rest = self._buffer[pos + len(marker):]
+        # println iza delimitera: "\n" ili "\r\n"
+        self._buffer = bytearray(rest.lstrip(b"\r\n"))
+        return image
+
+_shared_renderer = None
+
+def shared_renderer(timeout=RENDER_TIMEOUT):
+    # jedan renderer po procesu (i po batch workeru)
+    global _shared_renderer
+    if _shared_renderer is None:
+        _shared_renderer = PlantUMLPipeRenderer(timeout=timeout)
+        atexit.register(_shared_renderer.close)
+    return _shared_renderer
@@ -0,0 +1,425 @@
+import os
+import glob
+import json
+import time
+import pstats
+import cProfile
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from antlr4.tree.Tree import ParseTreeListener
+
+# Mjerenje po fazama (--profile): čitanje, lekser, parser, visitor, generisanje
+# dijagrama, renderovanje. Profil je globalan po procesu (kao parse_stats), pa
+# ga batch workeri imaju svaki za sebe, jedan fajl za drugim.
+STAGES = ("read", "lex", "parse", "visit", "generate", "render")
+
+# --memprofile: živa memorija se razvrstava po fajlu u kojem je alocirana
+# (prvi okvir tracemalloc tracebacka).
+CATEGORIES = (
+    ("token stream", ("antlr4/Token.py", "antlr4/CommonTokenFactory.py", "antlr4/Lexer.py",
+                      "antlr4/BufferedTokenStream.py", "antlr4/CommonTokenStream.py",
+                      "antlr4/InputStream.py", "PhpLexer.py")),
+    ("parse tree", ("antlr4/ParserRuleContext.py", "antlr4/RuleContext.py", "antlr4/tree/",
+                    "antlr4/Parser.py", "PhpParser.py")),
+    ("DFA keš parsera", ("antlr4/atn/", "antlr4/dfa/", "antlr4/PredictionContext.py")),
+    ("activity tree", ("MyVisitor.py",)),
+    ("UML tekst", ("Generate_Uml_Activity.py", "Generate_Svg_Activity.py",
+                   "Generate_Mermaid_Activity.py", "diagram_formats.py", "uml_output.py")),
+)
+TOP_SITES = 5
+
+# --rule-profile: lanac prioriteta izraza iz PhpParser.g4 (expression -> ... -> primaryExpression)
+EXPRESSION_CHAIN = (
+    "expression", "assignmentExpression", "conditionalExpression", "logicalOrExpression",
+    "logicalAndExpression", "equalityExpression", "concatExpression", "relationalExpression",
+    "additiveExpression", "multiplicativeExpression", "unaryExpression", "primaryExpression",
+)
+
+_active = None
+
+def memory_category(filename):
+    filename = filename.replace(os.sep, "/")
+    for name, patterns in CATEGORIES:
+        if any(p in filename for p in patterns):
+            return name
+    return "ostalo"
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__)).replace(os.sep, "/") + "/"
+
+def _short_path(filename):
+    filename = filename.replace(os.sep, "/")
+    if filename.startswith(_BASE_DIR):
+        return filename[len(_BASE_DIR):]
+    return filename.split("site-packages/")[-1]
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+
+def _categories(snapshot):
+    sizes = {}
+    for stat in snapshot.statistics("filename"):
+        cat = memory_category(stat.traceback[0].filename)
+        sizes[cat] = sizes.get(cat, 0) + stat.size
+    return sizes
+
+class RuleProfiler(ParseTreeListener):
+    # Parse listener: broj poziva, inkluzivno i ekskluzivno vrijeme po pravilu
+    # gramatike. Inkluzivno vrijeme rekurzivnog pravila se broji samo za
+    # najvanjski poziv; ekskluzivno ne uključuje vrijeme podpravila.
+    def __init__(self):
+        self.rules = {}
+        self.stack = []
+        self.active = {}
+        self.rule_names = None
+
+    def enterEveryRule(self, ctx):
+        if ctx.parentCtx is None:
+            # phpBlock iznova (SLL -> LL fallback): BailErrorStrategy je prekinuo
+            # parsiranje bez exitRule događaja, pa stek više ne važi
+            self.stack = []
+            self.active = {}
+            self.rule_names = ctx.parser.ruleNames
+        index = ctx.getRuleIndex()
+        self.active[index] = self.active.get(index, 0) + 1
+        self.stack.append([index, time.perf_counter(), 0.0])
+
+    def exitEveryRule(self, ctx):
+        if not self.stack:
+            return
+        index, start, children = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        entry = self.rules.setdefault(index, [0, 0.0, 0.0])
+        entry[0] += 1
+        self.active[index] -= 1
+        if not self.active[index]:
+            entry[1] += elapsed
+        entry[2] += elapsed - children
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def stats(self):
+        names = self.rule_names or ()
+        return {(names[i] if i < len(names) else str(i)):
+                {"count": c, "inclusive": round(inc, 6), "exclusive": round(exc, 6)}
+                for i, (c, inc, exc) in self.rules.items()}
+
+class StageTimer:
+    def __init__(self, input_file, memory=False, rules=False):
+        self.file = input_file
+        self.stages = {}
+        self.counts = {}
+        self.rule_profiler = RuleProfiler() if rules else None
+        # memory: tracemalloc snimak na kraju svake faze, poređen sa prethodnim
+        self.memory = {} if memory else None
+        self.categories = {}
+        self._snapshot = _snapshot() if memory else None
+
+    @contextmanager
+    def stage(self, name):
+        if self.memory is not None:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+            entry["wall"] += time.perf_counter() - wall
+            entry["cpu"] += time.process_time() - cpu
+            if self.memory is not None:
+                self._memory_stage(name, before)
+
+    def _memory_stage(self, name, before):
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = _snapshot()
+        entry = self.memory.setdefault(name, {"peak": 0, "retained": 0, "top": {}})
+        entry["peak"] = max(entry["peak"], peak)
+        entry["retained"] += current - before
+        for stat in snapshot.compare_to(self._snapshot, "lineno")[:TOP_SITES]:
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            site = f"{_short_path(frame.filename)}:{frame.lineno}"
+            top = entry["top"].setdefault(site, {"size": 0, "count": 0})
+            top["size"] += stat.size_diff
+            top["count"] += stat.count_diff
+        # kategorije: najveća vrijednost među snimcima na krajevima faza
+        for cat, size in _categories(snapshot).items():
+            self.categories[cat] = max(self.categories.get(cat, 0), size)
+        self._snapshot = snapshot
+
+    def add(self, name, wall, cpu=0.0):
+        entry = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+        entry["wall"] += wall
+        entry["cpu"] += cpu
+
+    def count(self, name, value):
+        self.counts[name] = value
+
+    def record(self):
+        record = {"file": self.file,
+                  "stages": {k: {"wall": round(v["wall"], 6), "cpu": round(v["cpu"], 6)}
+                             for k, v in self.stages.items()},
+                  "counts": dict(self.counts)}
+        if self.memory is not None:
+            record["memory"] = {
+                k: {"peak": v["peak"], "retained": v["retained"],
+                    "top": sorted(({"site": site, **t} for site, t in v["top"].items()),
+                                  key=lambda t: -t["size"])[:TOP_SITES]}
+                for k, v in self.memory.items()}
+            record["categories"] = dict(self.categories)
+        if self.rule_profiler is not None:
+            record["rules"] = self.rule_profiler.stats()
+        return record
+
+_started_tracing = False
+
+def start_profile(input_file, memory=False, rules=False):
+    global _active, _started_tracing
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracing = True
+    _active = StageTimer(input_file, memory, rules)
+    return _active
+
+def stop_profile():
+    global _active, _started_tracing
+    timer, _active = _active, None
+    record = timer.record() if timer is not None else None
+    if _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+    return record
+
+def profiling():
+    return _active is not None
+
+def fresh_analysis():
+    # memorija faza i pravila gramatike se mjere samo na stvarnom prolazu
+    # leksera, parsera i visitora, pa se rezultat analize tada ne čita iz keša
+    return _active is not None and (_active.memory is not None
+                                    or _active.rule_profiler is not None)
+
+def parse_listeners():
+    if _active is None or _active.rule_profiler is None:
+        return ()
+    return (_active.rule_profiler,)
+
+@contextmanager
+def stage(name):
+    if _active is None:
+        yield
+        return
+    with _active.stage(name):
+        yield
+
+def count(name, value):
+    if _active is not None:
+        _active.count(name, value)
+
+def count_tree_nodes(tree):
+    n = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        n += 1
+        stack.extend(getattr(node, "children", None) or ())
+    return n
+
+def count_activities(activities, memo=None):
+    # dijeljena podstabla (inlining) se broje onoliko puta koliko se pojavljuju
+    # u dijagramu, ali se obilaze samo jednom
+    memo = {} if memo is None else memo
+    total = 0
+    for act in activities:
+        entry = memo.get(id(act))
+        if entry is None:
+            entry = (act, 1 + count_activities(act.get("children", ()), memo))
+            memo[id(act)] = entry
+        total += entry[1]
+    return total
+
+def write_profile(path, records, append=False):
+    with open(path, "a" if append else "w", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+def format_profile_table(records):
+    lines = []
+    wall = {s: [] for s in STAGES}
+    cpu = {s: 0.0 for s in STAGES}
+    for r in records:
+        for s, v in r["stages"].items():
+            wall.setdefault(s, []).append(v["wall"])
+            cpu[s] = cpu.get(s, 0.0) + v["cpu"]
+    total = sum(sum(v) for v in wall.values()) or 1.0
+    lines.append(f"{'FAZA':<10} {'FAJLOVA':>7} {'WALL (s)':>10} {'CPU (s)':>10} "
+                 f"{'PROSJEK':>9} {'MAX':>9} {'UDIO':>6}")
+    for s, values in wall.items():
+        if not values:
+            continue
+        lines.append(f"{s:<10} {len(values):>7} {sum(values):>10.3f} {cpu[s]:>10.3f} "
+                     f"{sum(values) / len(values):>9.4f} {max(values):>9.4f} "
+                     f"{100 * sum(values) / total:>5.1f}%")
+    counts = {}
+    for r in records:
+        for k, v in r["counts"].items():
+            counts[k] = counts.get(k, 0) + v
+    if counts:
+        lines.append("Ukupno: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+    return "\n".join(lines)
+
+def _mb(n):
+    return f"{n / (1024 * 1024):.2f}"
+
+def format_memory_report(records):
+    # peak po fazi je najveći među fajlovima (za procjenu memorije po workeru),
+    # mjesta alokacije se sabiraju preko svih fajlova
+    peaks, retained, sites, categories = {}, {}, {}, {}
+    for r in records:
+        for s, v in (r.get("memory") or {}).items():
+            peaks[s] = max(peaks.get(s, 0), v["peak"])
+            retained[s] = max(retained.get(s, 0), v["retained"])
+            for t in v["top"]:
+                key = (s, t["site"])
+                sites[key] = sites.get(key, 0) + t["size"]
+        for cat, size in (r.get("categories") or {}).items():
+            categories[cat] = max(categories.get(cat, 0), size)
+
+    lines = [f"{'FAZA':<10} {'PEAK (MB)':>10} {'ZADRŽANO (MB)':>14}"]
+    for s in peaks:
+        lines.append(f"{s:<10} {_mb(peaks[s]):>10} {_mb(retained[s]):>14}")
+    if categories:
+        lines.append("Živa memorija po kategorijama (najviše na kraju neke faze):")
+        for cat, size in sorted(categories.items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {cat:<18} {_mb(size):>8} MB")
+    if sites:
+        lines.append("Najveća mjesta alokacije:")
+        for (s, site), size in sorted(sites.items(), key=lambda kv: -kv[1])[:2 * TOP_SITES]:
+            lines.append(f"  {s:<9} {_mb(size):>8} MB  {site}")
+    if peaks:
+        lines.append(f"Najveći peak po fajlu: {_mb(max(peaks.values()))} MB "
+                     f"(tracemalloc, bez overhead-a interpretera)")
+    return "\n".join(lines)
+
+def format_rule_report(records, top=25):
+    rules = {}
+    for r in records:
+        for name, v in (r.get("rules") or {}).items():
+            entry = rules.setdefault(name, {"count": 0, "inclusive": 0.0, "exclusive": 0.0})
+            for k in entry:
+                entry[k] += v[k]
+    if not rules:
+        return "Nema podataka o pravilima."
+    total = sum(v["exclusive"] for v in rules.values()) or 1.0
+    lines = [f"{'PRAVILO':<28} {'POZIVA':>9} {'INKL. (s)':>10} {'EKSKL. (s)':>10} "
+             f"{'EKSKL.':>7} {'µs/POZIV':>9}"]
+    for name, v in sorted(rules.items(), key=lambda kv: -kv[1]["exclusive"])[:top]:
+        lines.append(f"{name:<28} {v['count']:>9} {v['inclusive']:>10.3f} {v['exclusive']:>10.3f} "
+                     f"{100 * v['exclusive'] / total:>6.1f}% "
+                     f"{1e6 * v['exclusive'] / max(v['count'], 1):>9.1f}")
+    chain = sum(v["exclusive"] for name, v in rules.items() if name in EXPRESSION_CHAIN)
+    calls = sum(v["count"] for name, v in rules.items() if name in EXPRESSION_CHAIN)
+    lines.append(f"Lanac izraza ({len(EXPRESSION_CHAIN)} nivoa): {100 * chain / total:.1f}% "
+                 f"ekskluzivnog vremena parsiranja, {calls} poziva pravila "
+                 f"(vremena uključuju overhead listenera)")
+    return "\n".join(lines)
+
+# --cprofile: .pstats + "collapsed stack" tekst (flamegraph.pl, speedscope, ...).
+# cProfile pamti samo parove pozivalac -> pozvani, pa se stekovi rekonstruišu
+# iz grafa poziva: vrijeme funkcije se dijeli na putanje srazmjerno
+# kumulativnom vremenu svake grane (kao flameprof).
+COLLAPSED_MAX_DEPTH = 120
+COLLAPSED_MIN_SHARE = 1e-5
+
+def _frame_name(func):
+    filename, lineno, name = func
+    if filename == "~":
+        return name.strip("<>")
+    return f"{_short_path(filename)}:{name}".replace(";", ",")
+
+def collapsed_stacks(stats):
+    entries = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    roots = [f for f, v in entries.items() if not v[4]]
+    total = sum(entries[f][3] for f in roots) or 1.0
+    out = {}
+
+    def walk(func, inclusive, stack, on_stack):
+        ct, tt = entries[func][3], entries[func][2]
+        share = inclusive / ct if ct else 0.0
+        stack.append(_frame_name(func))
+        on_stack.add(func)
+        self_time = tt * share
+        if self_time > 0:
+            key = ";".join(stack)
+            out[key] = out.get(key, 0.0) + self_time
+        if len(stack) < COLLAPSED_MAX_DEPTH:
+            for child, edge_ct in callees.get(func, ()):
+                t = edge_ct * share
+                if child in on_stack or t < total * COLLAPSED_MIN_SHARE:
+                    continue
+                walk(child, t, stack, on_stack)
+        stack.pop()
+        on_stack.discard(func)
+
+    for root in roots:
+        walk(root, entries[root][3], [], set())
+    return out
+
+def write_collapsed(stats, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for key, seconds in sorted(collapsed_stacks(stats).items()):
+            us = int(seconds * 1e6)
+            if us > 0:
+                f.write(f"{key} {us}\n")
+
+_cprofile = None
+
+def start_cprofile():
+    global _cprofile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    _cprofile = profiler
+    return profiler
+
+def reset_cprofile():
+    # initializer batch workera: forkovani worker nasljeđuje aktivan profiler
+    # glavnog procesa, pa bi start_cprofile u workeru na Pythonu 3.12+ pao sa
+    # "Another profiling tool is already active"
+    global _cprofile
+    if _cprofile is not None:
+        _cprofile.disable()
+        _cprofile = None
+
+def dump_worker_cprofile(profiler, cprofile_dir):
+    # profil iz batch workera; save_cprofile ih spaja sa profilom glavnog procesa
+    global _cprofile
+    profiler.disable()
+    if _cprofile is profiler:
+        _cprofile = None
+    fd, path = tempfile.mkstemp(dir=cprofile_dir, prefix=f"{os.getpid()}-", suffix=".pstats")
+    os.close(fd)
+    profiler.dump_stats(path)
+
+def save_cprofile(prefix, profiler, worker_dir=None):
+    profiler.disable()
+    stats = pstats.Stats(profiler)
+    for path in sorted(glob.glob(os.path.join(worker_dir, "*.pstats"))) if worker_dir else ():
+        try:
+            stats.add(path)
+        except (OSError, EOFError, TypeError):
+            continue
+    pstats_file = prefix + ".pstats"
+    collapsed_file = prefix + ".collapsed"
+    stats.dump_stats(pstats_file)
+    write_collapsed(stats, collapsed_file)
+    return pstats_file, collapsed_file
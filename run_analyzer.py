@@ -1,63 +1,809 @@
 import sys
 import json
+import glob
+import time
+import argparse
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from antlr4 import *
 from PhpLexer import PhpLexer
-from PhpParser import PhpParser
 from MyVisitor import MyVisitor
-from Generate_Uml_Activity import generate_activity_uml 
-from StrictErrorListener import StrictErrorListener
+from Generate_Uml_Activity import collapse_activities, generate_activity_uml, iter_activity_uml_text
+from diagram_formats import FORMATS
+from parse_driver import parse_php, parse_stats
+from analysis_cache import AnalysisCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from file_watcher import watch_files
+from profiling import (count, count_activities, count_tree_nodes, format_memory_report,
+                       format_profile_table, format_rule_report, fresh_analysis,
+                       parse_listeners, profiling, stage, start_profile, stop_profile,
+                       write_profile, dump_worker_cprofile, reset_cprofile, save_cprofile,
+                       start_cprofile)
+from visitor_counters import VisitorCounters, format_counters, merge_counters, write_counters
+from uml_output import (atomic_write, file_digest, is_rendered, mark_rendered, png_path,
+                        sidecar_path, uml_digest, write_if_changed)
+from plantuml_renderer import (RenderError, RenderTimeout, render_batch,
+                               render_with_subprocess, shared_renderer)
 import subprocess
+import tempfile
+import shutil
 import os
 
 def ensure_output_folder(folder="PlantUML_code"):
     if not os.path.exists(folder):
         os.makedirs(folder)
-    return folder 
+    return folder
 
-def main(input_file):
-    input_stream = FileStream(input_file, encoding='utf-8')
+def analyze_file(input_file, cache=None, visitor_options=None, counters=None):
+    visitor_options = visitor_options or {}
+    with stage("read"), open(input_file, "rb") as f:
+        source = f.read()
 
+    if cache is not None:
+        key = cache.key_for(source, json.dumps(visitor_options, sort_keys=True))
+        # brojači (VisitorCounters), --memprofile i --rule-profile traže stvarni
+        # obilazak, pa se keš tada ne čita
+        entry = cache.get(key) if counters is None and not fresh_analysis() else None
+        if entry is not None:
+            count("cached", 1)
+            # nalazi visitora ([INFO], [SEMANTIC WARNING]) isto kao pri obilasku
+            for message in entry.get("findings", ()):
+                print(message)
+            return {"activities": entry["activities"], "uml": entry["uml"],
+                    "source": source.decode("utf-8"), "functions": entry.get("functions"),
+                    "inline_stats": entry.get("inline_stats"), "counters": None, "cached": True}
 
-    lexer = PhpLexer(input_stream)
-    token_stream = CommonTokenStream(lexer)
-    parser = PhpParser(token_stream)
+    with stage("lex"):
+        input_stream = InputStream(source.decode("utf-8"))
+        lexer = PhpLexer(input_stream)
+        token_stream = CommonTokenStream(lexer)
+        if profiling():
+            # inače lekser radi lijeno, usred parsiranja
+            token_stream.fill()
+    count("tokens", len(token_stream.tokens))
 
-    parser.removeErrorListeners()
-    parser.addErrorListener(StrictErrorListener())
+    with stage("parse"):
+        tree = parse_php(token_stream, parse_listeners())
+    if profiling():
+        count("parse_nodes", count_tree_nodes(tree))
 
-  
-    tree = parser.phpBlock()
+    with stage("visit"):
+        visitor = MyVisitor(counters=counters, **visitor_options)
+        visitor.visit(tree)
+    if profiling():
+        count("activities", count_activities(visitor.activities))
+
+
+    # Bez keša UML tekst se ne sklapa u memoriji: uml_chunks ga generiše
+    # u komadima direktno iz stabla aktivnosti. Uz --split-functions tekst
+    # ima linkove ka <fajl>__<funkcija>, a keš ne zna ime fajla, pa se ne čuva.
+    uml_code = None
+    functions = visitor.functionActivities or None
+    if cache is not None and functions is None:
+        with stage("generate"):
+            uml_code = generate_activity_uml(visitor.activities, visitor.source)
+    if cache is not None:
+        cache.put(key, visitor.activities, uml_code,
+                  {"inline_stats": visitor.inline_stats, "functions": functions,
+                   "findings": visitor.findings})
+    return {"activities": visitor.activities, "uml": uml_code, "source": visitor.source,
+            "functions": functions, "inline_stats": visitor.inline_stats,
+            "counters": counters.as_dict() if counters is not None else None, "cached": False}
+
+def uml_chunks(result, link_prefix=None):
+    if result["uml"] is not None:
+        return (result["uml"],)
+    return iter_activity_uml_text(result["activities"], result["source"], link_prefix=link_prefix)
+
+def link_prefix_for(input_file):
+    # dijagrami funkcija i dijelova su u istom direktoriju: <fajl>__<ime>
+    return os.path.splitext(os.path.basename(input_file))[0] + "__"
+
+def format_inline_stats(stats):
+    return (f"Inlining: max. dubina {stats['max_depth']}, "
+            f"rekurzivnih referenci {stats['recursive_refs']}, "
+            f"preko dubine {stats['depth_limited']}, "
+            f"preko budžeta {stats['budget_limited']}")
+
+def uml_path_for(input_file, ext=".uml", part=None, subdir=""):
+    # subdir: relativni direktorij ulaza u batch/watch modu (output_subdir), pa
+    # x/index.php i y/index.php ne pišu isti dijagram
+    output_dir = os.path.join(ensure_output_folder(), subdir)
+    os.makedirs(output_dir, exist_ok=True)
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    if part:
+        base_name = f"{base_name}__{part}"
+    return os.path.join(output_dir, f"{base_name}{ext}")
 
-    
-    visitor = MyVisitor()
+def save_native(input_file, result, fmt, render, part=None, subdir=""):
+    # Formati bez PlantUML-a (diagram_formats.FORMATS), direktno iz stabla aktivnosti
+    out_file = uml_path_for(input_file, FORMATS[fmt]["ext"], part, subdir)
+    with stage("generate"):
+        text = FORMATS[fmt]["generate"](result["activities"], result["source"],
+                                        link_prefix=link_prefix_for(input_file))
+        digest = uml_digest(text)
+        changed = file_digest(out_file) != digest
+        if changed:
+            atomic_write(out_file, text)
+
+    # .dot -> .svg lokalnim Graphviz-om, samo ako se .dot promijenio
+    # (<fajl>.dot.svg, da se ne sudari sa izlazom formata svg)
+    if fmt == "dot" and render:
+        svg_file = out_file + ".svg"
+        if not changed and os.path.exists(svg_file):
+            return out_file, "bez promjene", digest, False
+        try:
+            with stage("render"):
+                subprocess.run(["dot", "-Tsvg", out_file, "-o", svg_file], check=True)
+        except FileNotFoundError:
+            return out_file, "bez slike", digest, changed
+    return out_file, "ok" if changed else "bez promjene", digest, changed
+
+def save_and_render(input_file, result, render, fmt="plantuml", part=None, subdir=""):
+    # Vraća (fajl, status, digest, da li je fajl upisan)
+    if fmt != "plantuml":
+        return save_native(input_file, result, fmt, render, part, subdir)
+
+    uml_file = uml_path_for(input_file, part=part, subdir=subdir)
+    with stage("generate"):
+        digest, written = write_if_changed(uml_file, uml_chunks(result, link_prefix_for(input_file)))
+    # isti UML kao pri posljednjem uspješnom renderovanju, a PNG postoji
+    if render and not written and is_rendered(uml_file, digest):
+        return uml_file, "bez promjene", digest, False
+
+    if not render or render == "batch":
+        return uml_file, "ok", digest, written
     try:
-        visitor.visit(tree)
+        with stage("render"):
+            render_png(uml_file, render, result["uml"])
+    except FileNotFoundError:
+        # nema jave/PlantUML-a: .uml ostaje, ostali dijagrami i formati se i dalje pišu
+        return uml_file, "bez slike", digest, written
+    mark_rendered(uml_file, digest)
+    return uml_file, "ok", digest, written
+
+def save_diagrams(input_file, result, render, formats=("plantuml",), diagram_options=None):
+    # Vraća [{"file", "format", "part", "status", "digest", "error", "written"}]: dijagram skripte,
+    # a uz --split-functions i po jedan dijagram za svaku deklarisanu funkciju
+    # (i za sažete dijelove, uz --collapsed-diagrams) - svaki u svim formatima.
+    diagram_options = diagram_options or {}
+    subdir = diagram_options.get("subdir", "")
+    units = [(None, result)] + [
+        (name, {"uml": None, "activities": acts, "source": result["source"]})
+        for name, acts in (result.get("functions") or {}).items()
+    ]
+    if diagram_options.get("max_nodes"):
+        with stage("generate"):
+            units = budget_units(units, diagram_options["max_nodes"],
+                                 diagram_options.get("collapsed_parts", False))
+
+    # Svaki dijagram ide kroz izabrani backend: uz pipe kroz isti dugovječni
+    # PlantUML proces workera, a uz batch se samo upisuje i renderuje kasnije
+    # (render_all u run_batch, render_file_diagrams za jedan fajl i u watch
+    # modu). Nepromijenjeni zadržavaju postojeće slike.
+    diagrams = []
+    for part, unit in units:
+        for fmt in formats:
+            try:
+                out_file, status, digest, written = save_and_render(input_file, unit, render,
+                                                                    fmt, part, subdir)
+                error = None
+            except (RenderError, subprocess.CalledProcessError) as e:
+                out_file = uml_path_for(input_file, FORMATS[fmt]["ext"], part, subdir)
+                status, digest, error, written = "greska", None, str(e), False
+            diagrams.append({"file": out_file, "format": fmt, "part": part, "status": status,
+                             "digest": digest, "error": error, "written": written})
+    remove_stale_parts(input_file, diagrams, subdir)
+    return diagrams
+
+def remove_stale_parts(input_file, diagrams, subdir=""):
+    # <fajl>.parts pamti dijagrame funkcija (i dijelova) iz prošlog pokretanja;
+    # oni koji više ne nastaju (obrisana funkcija) se brišu zajedno sa slikama.
+    manifest = uml_path_for(input_file, ".parts", subdir=subdir)
+    folder = os.path.dirname(manifest)
+    current = [os.path.basename(d["file"]) for d in diagrams if d["part"]]
+    try:
+        with open(manifest, "r", encoding="utf-8") as f:
+            previous = f.read().splitlines()
+    except OSError:
+        previous = []
+    for name in set(previous) - set(current):
+        path = os.path.join(folder, name)
+        stale = [path]
+        if path.endswith(".uml"):
+            stale += [png_path(path), sidecar_path(path)]
+        elif path.endswith(".dot"):
+            stale.append(path + ".svg")
+        for p in stale:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+    if current:
+        if current != previous:
+            atomic_write(manifest, "".join(name + "\n" for name in current))
+    elif previous:
+        os.remove(manifest)
+
+def budget_units(units, max_nodes, collapsed_parts=False):
+    # Dijagrami preko budžeta čvorova se sažimaju; sažeti dijelovi postaju
+    # <fajl>__deoN (ili <fajl>__<funkcija>__deoN) dijagrami.
+    out = []
+    for part, unit in units:
+        parts = [] if collapsed_parts else None
+        counter = itertools.count(1)
+        prefix = f"{part}__" if part else ""
+        acts = collapse_activities(unit["activities"], unit["source"], max_nodes, parts,
+                                   lambda: f"{prefix}deo{next(counter)}")
+        if acts is not unit["activities"]:
+            unit = {"uml": None, "activities": acts, "source": unit["source"]}
+        out.append((part, unit))
+        out.extend((name, {"uml": None, "activities": part_acts, "source": unit["source"]})
+                   for name, part_acts in parts or ())
+    return out
+
+def render_pending(diagrams):
+    pending = [d for d in diagrams if d["status"] == "ok" and d["format"] == "plantuml"]
+    if not pending:
+        return
+    with stage("render"):
+        errors = render_batch([d["file"] for d in pending])
+    for d in pending:
+        d["error"] = errors.get(d["file"])
+        if d["error"]:
+            d["status"] = "greska"
+        else:
+            mark_rendered(d["file"], d["digest"])
+
+def render_file_diagrams(diagrams, render):
+    # Jedan fajl (main, watch): save_diagrams samo upisuje .uml, a ovdje se
+    # više PlantUML dijagrama (funkcije, sažeti dijelovi) renderuje jednim
+    # render_batch pozivom, paralelno (-nbthread); jedan dijagram ide
+    # izabranim backendom (uz pipe kroz već pokrenut PlantUML proces).
+    pending = [d for d in diagrams if d["status"] == "ok" and d["format"] == "plantuml"]
+    if not render or not pending:
+        return
+    try:
+        if render == "batch" or len(pending) > 1:
+            render_pending(pending)
+            return
+        d = pending[0]
+        try:
+            with stage("render"):
+                render_png(d["file"], render)
+            mark_rendered(d["file"], d["digest"])
+        except (RenderError, subprocess.CalledProcessError) as e:
+            d["status"], d["error"] = "greska", str(e)
+    except FileNotFoundError:
+        for d in pending:
+            d["status"] = "bez slike"
+
+def diagrams_status(diagrams):
+    errors = [d for d in diagrams if d["error"]]
+    if errors:
+        return "greska", f"{os.path.basename(errors[0]['file'])}: {errors[0]['error']}"
+    if all(d["status"] == "bez promjene" for d in diagrams):
+        return "bez promjene", None
+    if any(d["status"] == "bez slike" for d in diagrams):
+        return "bez slike", None
+    return "ok", None
+
+def render_png(uml_file, backend="pipe", uml_code=None):
+    if backend != "pipe":
+        return render_with_subprocess(uml_file)
+
+    if uml_code is None:
+        with open(uml_file, "r", encoding="utf-8") as f:
+            uml_code = f.read()
+    try:
+        image = shared_renderer().render(uml_code)
+    except RenderTimeout:
+        raise
+    except RenderError as e:
+        print(f"[UPOZORENJE] PlantUML pipe nije uspio ({e}), pokrećem zaseban JVM.")
+        return render_with_subprocess(uml_file)
+
+    png_file = png_path(uml_file)
+    atomic_write(png_file, image)
+    return png_file
+
+def open_cache(cache_dir, cache_size_mb=None):
+    if cache_dir is None:
+        return None
+    max_bytes = DEFAULT_MAX_BYTES if cache_size_mb is None else int(cache_size_mb * 1024 * 1024)
+    return AnalysisCache(cache_dir, max_bytes)
+
+def main(input_file, render="pipe", cache_dir=DEFAULT_CACHE_DIR, cache_size_mb=None,
+         visitor_options=None, formats=("plantuml",), diagram_options=None, profile=None,
+         memprofile=None, rule_profile=False, visitor_counters=None):
+    cache = open_cache(cache_dir, cache_size_mb)
+    if profile or memprofile or rule_profile:
+        start_profile(input_file, memory=bool(memprofile), rules=rule_profile)
+    try:
+        result = analyze_file(input_file, cache, visitor_options,
+                              VisitorCounters() if visitor_counters else None)
     except Exception as e:
         print(f"\nAnaliza prekinuta: {e}")
         sys.exit(1)
+    if cache is not None:
+        cache.prune()
+    if result["cached"]:
+        print("Rezultat analize preuzet iz keša.")
+    stats = result["inline_stats"]
+    if stats and (stats["recursive_refs"] or stats["depth_limited"] or stats["budget_limited"]):
+        print(format_inline_stats(stats))
 
-   
-    uml_code = generate_activity_uml(visitor.activities)
+    try:
+        diagrams = save_diagrams(input_file, result, "batch" if render else None, formats,
+                                 diagram_options)
+        render_file_diagrams(diagrams, render)
+        missing = False
+        for d in diagrams:
+            uml_file = d["file"]
+            if d["format"] != "plantuml":
+                if d["status"] == "bez promjene":
+                    print(f"Dijagram nije promijenjen: {uml_file}")
+                elif d["status"] == "bez slike":
+                    print(f"Graphviz (dot) nije pronađen. Sačuvan je samo {uml_file}")
+                else:
+                    print(f"Dijagram kreiran: {uml_file}")
+                continue
+            if d["status"] == "bez promjene":
+                print(f"UML nije promijenjen, dijagram je ažuran: {png_path(uml_file)}")
+                continue
+            if d["written"]:
+                print(f"PlantUML kod sačuvan u: {uml_file}")
+            else:
+                print(f"UML nije promijenjen: {uml_file}")
+            if d["error"]:
+                print(f"Dijagram nije kreiran: {d['error']}")
+            elif d["status"] == "bez slike":
+                missing = True
+            elif render:
+                print(f"Dijagram kreiran: {png_path(uml_file)}")
+        if missing:
+            print("PlantUML nije pronađen. Preskačem vizuelno generisanje.")
+    except FileNotFoundError:
+        print("PlantUML nije pronađen. Preskačem vizuelno generisanje.")
+    except (RenderError, subprocess.CalledProcessError) as e:
+        print(f"Dijagram nije kreiran: {e}")
+    if profile or memprofile or rule_profile:
+        report_profile([stop_profile()], profile, memprofile, rule_profile)
+    if visitor_counters:
+        report_counters([{"file": input_file, "counters": result["counters"]}], visitor_counters)
 
-   
-    output_dir = ensure_output_folder()
-    base_name = os.path.splitext(os.path.basename(input_file))[0]
-    uml_file = os.path.join(output_dir, f"{base_name}.uml")
+# ---- BATCH MOD ----
+
+def collect_php_files(patterns):
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, dirs, names in os.walk(pattern):
+                dirs.sort()
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.endswith(".php"))
+        elif glob.has_magic(pattern):
+            files.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            files.append(pattern)
+
+    seen = set()
+    unique = []
+    for f in files:
+        key = os.path.abspath(f)
+        if key not in seen:
+            seen.add(key)
+            unique.append(f)
+    return unique
+
+def pattern_root(pattern):
+    # direktorij čija se struktura preslikava u PlantUML_code: sam direktorij,
+    # dio globa prije prvog džokera ili direktorij fajla
+    if os.path.isdir(pattern):
+        return os.path.abspath(pattern)
+    root = pattern if glob.has_magic(pattern) else os.path.dirname(pattern)
+    while glob.has_magic(root):
+        root = os.path.dirname(root)
+    return os.path.abspath(root or os.curdir)
+
+def output_root(patterns):
+    try:
+        return os.path.commonpath([pattern_root(p) for p in patterns])
+    except ValueError:
+        # različiti diskovi (Windows): bez preslikavanja, sudare hvata output_collisions
+        return None
 
-    with open(uml_file, "w", encoding="utf-8") as f:
-        f.write(uml_code)
-    print(f"PlantUML kod sačuvan u: {uml_file}")
+def output_subdir(input_file, root):
+    if root is None:
+        return ""
+    rel = os.path.relpath(os.path.dirname(os.path.abspath(input_file)), root)
+    if rel == os.curdir or rel.startswith(os.pardir):
+        return ""
+    return rel
 
-    #
+def output_collisions(files, root):
+    # parovi fajlova koji bi pisali isti dijagram (npr. a.php i a.PHP)
+    seen = {}
+    clashes = []
+    for f in files:
+        stem = os.path.splitext(os.path.basename(f))[0]
+        key = os.path.normcase(os.path.join(output_subdir(f, root), stem))
+        if key in seen:
+            clashes.append((seen[key], f))
+        else:
+            seen[key] = f
+    return clashes
+
+def process_file(input_file, render="pipe", cache_dir=None, cache_size_mb=None,
+                 visitor_options=None, formats=("plantuml",), diagram_options=None,
+                 profile=None, cprofile_dir=None, visitor_counters=False):
+    # profile: None ili opcije za start_profile ({"memory": ..., "rules": ...})
+    result = {"file": input_file, "status": "ok", "uml_file": None, "error": None,
+              "cached": False, "inline_stats": None, "diagrams": [], "profile": None,
+              "counters": None}
+    profiler = None
+    start = time.perf_counter()
+    ll_before = parse_stats["ll_fallback"]
     try:
-        plantuml_path = os.path.join(os.path.dirname(__file__), "jars", "plantuml.jar")
-        subprocess.run(["java", "-jar", plantuml_path, uml_file], check=True)
-        print(f"Dijagram kreiran: {os.path.join(output_dir, base_name)}.png")
+        # profileri se pokreću u try, pa greška pri pokretanju obara samo ovaj fajl
+        if cprofile_dir:
+            profiler = start_cprofile()
+        if profile is not None:
+            start_profile(input_file, **profile)
+        analysis = analyze_file(input_file, open_cache(cache_dir, cache_size_mb), visitor_options,
+                                VisitorCounters() if visitor_counters else None)
+        result["cached"] = analysis["cached"]
+        result["counters"] = analysis["counters"]
+        result["inline_stats"] = analysis["inline_stats"]
+        try:
+            result["diagrams"] = save_diagrams(input_file, analysis, render, formats, diagram_options)
+            result["uml_file"] = result["diagrams"][0]["file"]
+            result["status"], result["error"] = diagrams_status(result["diagrams"])
+        except FileNotFoundError:
+            result["uml_file"] = uml_path_for(input_file, subdir=(diagram_options or {}).get("subdir", ""))
+            result["status"] = "bez slike"
+    except Exception as e:
+        result["status"] = "greska"
+        result["error"] = str(e)
+    result["ll_fallback"] = parse_stats["ll_fallback"] > ll_before
+    result["seconds"] = time.perf_counter() - start
+    if profile is not None:
+        result["profile"] = stop_profile()
+    if profiler is not None:
+        dump_worker_cprofile(profiler, cprofile_dir)
+    return result
+
+def print_summary(results, elapsed):
+    print("\n" + "=" * 72)
+    print(f"{'STATUS':<12} {'VRIJEME (s)':>11}  FAJL")
+    print("-" * 72)
+    for r in results:
+        print(f"{r['status']:<12} {r['seconds']:>11.3f}  {r['file']}")
+        if r["error"]:
+            print(f"{'':<12} {'':>11}  -> {r['error']}")
+    print("-" * 72)
+
+    failed = sum(1 for r in results if r["status"] == "greska")
+    total_cpu = sum(r["seconds"] for r in results)
+    print(f"Fajlova: {len(results)}, uspješno: {len(results) - failed}, neuspješno: {failed}")
+    print(f"Ukupno vrijeme: {elapsed:.3f}s (zbir po fajlovima: {total_cpu:.3f}s)")
+    cached = sum(1 for r in results if r["cached"])
+    ll = sum(1 for r in results if r["ll_fallback"])
+    print(f"Keš: {cached} pogodaka, {len(results) - cached} promašaja")
+    unchanged = sum(1 for r in results if r["status"] == "bez promjene")
+    if unchanged:
+        print(f"Nepromijenjeni dijagrami (bez renderovanja): {unchanged}")
+    print(f"Parsiranje: SLL {len(results) - cached - ll}, LL fallback {ll}")
+    totals = {"max_depth": 0, "recursive_refs": 0, "depth_limited": 0, "budget_limited": 0}
+    for r in results:
+        for k, v in (r["inline_stats"] or {}).items():
+            totals[k] = max(totals[k], v) if k == "max_depth" else totals[k] + v
+    print(format_inline_stats(totals))
+    if results:
+        slowest = max(results, key=lambda r: r["seconds"])
+        print(f"Najsporiji fajl: {slowest['file']} ({slowest['seconds']:.3f}s)")
+
+def run_batch(patterns, jobs=None, render="pipe", cache_dir=DEFAULT_CACHE_DIR, cache_size_mb=None,
+              visitor_options=None, formats=("plantuml",), diagram_options=None, profile=None,
+              memprofile=None, rule_profile=False, cprofile_dir=None, visitor_counters=None):
+    files = collect_php_files(patterns)
+    if not files:
+        print("Nije pronađen nijedan .php fajl.")
+        return 1
+    root = output_root(patterns)
+    clashes = output_collisions(files, root)
+    if clashes:
+        print("Više ulaznih fajlova bi pisalo isti dijagram:")
+        for a, b in clashes:
+            print(f"  {a}  <->  {b}")
+        return 1
+
+    start = time.perf_counter()
+    results = []
+    profile_options = None
+    if profile or memprofile or rule_profile:
+        profile_options = {"memory": bool(memprofile), "rules": rule_profile}
+    # Worker procesi su dugovječni: PhpLexer/PhpParser (i deserijalizacija ATN-a)
+    # se učitaju jednom po workeru, a DFA keš parsera se dijeli između fajlova.
+    # reset_cprofile: workeri ne smiju naslijediti aktivan --cprofile glavnog procesa
+    with ProcessPoolExecutor(max_workers=jobs, initializer=reset_cprofile) as pool:
+        # batch: workeri samo analiziraju, a svi dijagrami se renderuju na kraju
+        futures = {pool.submit(process_file, f, render, cache_dir, cache_size_mb, visitor_options,
+                               formats, dict(diagram_options or {}, subdir=output_subdir(f, root)),
+                               profile_options, cprofile_dir,
+                               bool(visitor_counters)): f
+                   for f in files}
+        for fut in as_completed(futures):
+            r = fut.result()
+            print(f"[{len(results) + 1}/{len(files)}] {r['status']:<9} {r['file']} ({r['seconds']:.3f}s)")
+            results.append(r)
+
+    cache = open_cache(cache_dir, cache_size_mb)
+    if cache is not None:
+        cache.prune()
+
+    order = {f: i for i, f in enumerate(files)}
+    results.sort(key=lambda r: order[r["file"]])
+    if render == "batch" and "plantuml" in formats:
+        render_all(results)
+    print_summary(results, time.perf_counter() - start)
+    if profile_options is not None:
+        records = []
+        for r in results:
+            if r["profile"]:
+                r["profile"].update(status=r["status"], seconds=round(r["seconds"], 6))
+                records.append(r["profile"])
+        report_profile(records, profile, memprofile, rule_profile)
+    if visitor_counters:
+        report_counters([{"file": r["file"], "counters": r["counters"]}
+                         for r in results if r["counters"]], visitor_counters)
+    return 1 if any(r["status"] == "greska" for r in results) else 0
+
+def report_profile(records, profile=None, memprofile=None, rule_profile=False, append=False,
+                   quiet=False):
+    for path in dict.fromkeys(p for p in (profile, memprofile) if p):
+        write_profile(path, records, append)
+    if quiet:
+        return
+    if profile:
+        print(f"\nProfil po fazama ({profile}):")
+        print(format_profile_table(records))
+    if memprofile:
+        print(f"\nProfil memorije ({memprofile}):")
+        print(format_memory_report(records))
+    if rule_profile:
+        print("\nPravila gramatike po ekskluzivnom vremenu:")
+        print(format_rule_report(records))
+
+def report_counters(records, target="-", append=False):
+    # target: "-" ispis na kraju, inače JSON zapis po fajlu u taj fajl
+    if target != "-":
+        write_counters(target, records, append)
+        print(f"\nBrojači visitora sačuvani u {target}")
+        return
+    if not records:
+        print("\nBrojači visitora: nema analiziranih fajlova.")
+        return
+    print("\nBrojači visitora:")
+    print(format_counters(merge_counters(r["counters"] for r in records)))
+    if len(records) > 1:
+        print("Fajlovi sa najviše posla (aktivnosti / regex / getText znakova):")
+        def work(r):
+            c = r["counters"]
+            return sum(c["activities"].values()), sum(c["regex"].values()), c["text_chars"]
+        for r in sorted(records, key=work, reverse=True)[:5]:
+            a, rx, chars = work(r)
+            print(f"  {a:>8} {rx:>8} {chars:>10}  {r['file']}")
+
+def render_all(results):
+    # status po dijagramu: npr. "bez slike" za .dot bez Graphviza ne smije
+    # preskočiti PlantUML dijagrame istog fajla; status fajla tek nakon toga
+    pending = [(r, d) for r in results
+               for d in r["diagrams"] if d["status"] == "ok" and d["format"] == "plantuml"]
+    if not pending:
+        return
+    print(f"\nRenderujem {len(pending)} dijagrama jednim PlantUML pozivom...")
+    start = time.perf_counter()
+    try:
+        render_pending([d for _, d in pending])
     except FileNotFoundError:
+        for r, d in pending:
+            d["status"] = "bez slike"
+            r["status"], r["error"] = diagrams_status(r["diagrams"])
         print("PlantUML nije pronađen. Preskačem vizuelno generisanje.")
+        return
+    elapsed = time.perf_counter() - start
+    for r, _ in pending:
+        # vrijeme renderovanja se dijeli ravnomjerno na dijagrame iz batcha
+        r["seconds"] += elapsed / len(pending)
+        if r["profile"]:
+            entry = r["profile"]["stages"].setdefault("render", {"wall": 0.0, "cpu": 0.0})
+            entry["wall"] = round(entry["wall"] + elapsed / len(pending), 6)
+    for r in {id(r): r for r, _ in pending}.values():
+        r["status"], r["error"] = diagrams_status(r["diagrams"])
+    print(f"Renderovanje završeno za {elapsed:.3f}s")
+
+# ---- WATCH MOD ----
+
+def run_watch(patterns, render="pipe", cache_dir=DEFAULT_CACHE_DIR, cache_size_mb=None,
+              interval=0.5, debounce=0.3, visitor_options=None, formats=("plantuml",),
+              diagram_options=None, profile=None, memprofile=None, rule_profile=False,
+              visitor_counters=None):
+    cache = open_cache(cache_dir, cache_size_mb)
+    root = output_root(patterns)
+    hashes = {}
+    print("Pratim promjene (Ctrl+C za izlaz)...")
+    try:
+        for changed in watch_files(lambda: collect_php_files(patterns), interval, debounce):
+            for input_file in changed:
+                try:
+                    with open(input_file, "rb") as f:
+                        digest = hashlib.sha256(f.read()).hexdigest()
+                except OSError:
+                    continue
+                # mtime se promijenio, ali sadržaj nije (touch, ponovno snimanje)
+                if hashes.get(input_file) == digest:
+                    continue
+                hashes[input_file] = digest
+                if profile or memprofile or rule_profile:
+                    start_profile(input_file, memory=bool(memprofile), rules=rule_profile)
+                counters = VisitorCounters() if visitor_counters else None
+                result = _watch_process(input_file, render, cache, visitor_options, formats,
+                                        dict(diagram_options or {},
+                                             subdir=output_subdir(input_file, root)),
+                                        counters)
+                if profile or memprofile or rule_profile:
+                    report_profile([stop_profile()], profile, memprofile, rule_profile,
+                                   append=True, quiet=not rule_profile)
+                if result is not None and result["counters"] is not None:
+                    report_counters([{"file": input_file, "counters": result["counters"]}],
+                                    visitor_counters, append=True)
+            if cache is not None:
+                cache.prune()
+    except KeyboardInterrupt:
+        print("\nPraćenje zaustavljeno.")
+    return 0
+
+def _watch_process(input_file, render, cache, visitor_options, formats=("plantuml",),
+                   diagram_options=None, counters=None):
+    start = time.perf_counter()
+    try:
+        result = analyze_file(input_file, cache, visitor_options, counters)
+    except Exception as e:
+        print(f"[greska] {input_file}: {e}")
+        return None
+
+    uml_file = uml_path_for(input_file, subdir=(diagram_options or {}).get("subdir", ""))
+    try:
+        diagrams = save_diagrams(input_file, result, "batch" if render else None, formats,
+                                 diagram_options)
+        render_file_diagrams(diagrams, render)
+        uml_file = diagrams[0]["file"]
+        status, error = diagrams_status(diagrams)
+        if error:
+            status = f"greska: {error}"
+        elif len(diagrams) > 1:
+            status += f", {len(diagrams)} dijagrama"
+    except FileNotFoundError:
+        status = "bez slike"
+    except RenderError as e:
+        status = f"greska: {e}"
+    except subprocess.CalledProcessError as e:
+        status = f"greska: {e}"
+    print(f"[{status}] {input_file} -> {uml_file} ({time.perf_counter() - start:.3f}s)")
+    return result
+
+def parse_args(argv):
+    ap = argparse.ArgumentParser(
+        description="Generisanje UML dijagrama aktivnosti iz PHP koda."
+    )
+    ap.add_argument("paths", nargs="+",
+                    help="PHP fajl, direktorij ili glob (npr. 'src/**/*.php')")
+    ap.add_argument("-j", "--jobs", type=int, default=None,
+                    help="broj worker procesa u batch modu (default: broj CPU jezgara)")
+    ap.add_argument("--no-render", action="store_true",
+                    help="samo generiši .uml, bez pokretanja PlantUML-a")
+    ap.add_argument("--render-backend", choices=["pipe", "subprocess", "batch"], default="pipe",
+                    help="pipe: jedan dugovječni PlantUML proces (default); "
+                         "subprocess: novi JVM za svaki dijagram; "
+                         "batch: svi dijagrami jednim PlantUML pozivom nakon analize")
+    ap.add_argument("--format", nargs="+", choices=sorted(FORMATS), default=["plantuml"],
+                    dest="formats", metavar="FORMAT",
+                    help="jedan ili više izlaznih formata iz istog prolaza parsera: "
+                         "plantuml: .uml + PNG preko PlantUML-a (default); "
+                         "svg: SVG direktno iz Pythona, bez JVM-a; "
+                         "dot: Graphviz .dot (i .svg ako je 'dot' instaliran); "
+                         "mermaid: .mmd flowchart; json: stablo aktivnosti (.json)")
+    ap.add_argument("--split-functions", action="store_true",
+                    help="poseban dijagram za svaku funkciju (<fajl>__<funkcija>) i za skriptu, "
+                         "pozivi su reference umjesto inline tijela")
+    ap.add_argument("--max-diagram-nodes", type=int, default=None, metavar="N",
+                    help="budžet čvorova po dijagramu: najdublji blokovi preko budžeta se sažimaju "
+                         "u jedan čvor '… N naredbi …' (default: bez ograničenja)")
+    ap.add_argument("--collapsed-diagrams", action="store_true",
+                    help="sažete dijelove sačuvaj kao posebne dijagrame (<fajl>__deoN)")
+    ap.add_argument("--watch", action="store_true",
+                    help="prati fajlove i ponovo analiziraj samo one čiji se sadržaj promijenio")
+    ap.add_argument("--interval", type=float, default=0.5,
+                    help="interval provjere promjena u watch modu, u sekundama")
+    ap.add_argument("--debounce", type=float, default=0.3,
+                    help="koliko dugo fajlovi moraju mirovati prije ponovne analize, u sekundama")
+    ap.add_argument("--max-inline-depth", type=int, default=32,
+                    help="maksimalna dubina inlininga poziva funkcija (default: 32)")
+    ap.add_argument("--max-inline-nodes", type=int, default=200000,
+                    help="maksimalan broj aktivnosti nastalih inliningom po fajlu (default: 200000)")
+    ap.add_argument("--profile", nargs="?", const="profile.jsonl", default=None, metavar="FAJL",
+                    help="mjeri wall/CPU vrijeme po fazama (lekser, parser, visitor, generisanje, "
+                         "renderovanje) i broj tokena/čvorova/aktivnosti; jedan JSON zapis po fajlu "
+                         "u FAJL (default: profile.jsonl), uz zbirnu tabelu na kraju")
+    ap.add_argument("--memprofile", nargs="?", const="memprofile.jsonl", default=None, metavar="FAJL",
+                    help="tracemalloc snimci između faza: peak i zadržana memorija po fazi, najveća "
+                         "mjesta alokacije i podjela na token stream, parse tree, activity tree i "
+                         "UML tekst (default: memprofile.jsonl); usporava obradu, a analiza "
+                         "tada ne čita keš")
+    ap.add_argument("--rule-profile", action="store_true",
+                    help="parse listener na PhpParser-u: broj poziva, inkluzivno i ekskluzivno "
+                         "vrijeme po pravilu gramatike, rangirano; analiza tada ne čita keš")
+    ap.add_argument("--cprofile", nargs="?", const="cprofile", default=None, metavar="PREFIKS",
+                    help="cProfile cijelog pokretanja: PREFIKS.pstats i PREFIKS.collapsed "
+                         "(collapsed stack za flame graph); u batch modu se spajaju profili "
+                         "svih workera (default: cprofile)")
+    ap.add_argument("--visitor-counters", nargs="?", const="-", default=None, metavar="FAJL",
+                    help="brojači posla visitora: inlininzi po funkciji, max. dubina, regex pozivi "
+                         "po patternu, znakovi iz getText(), kreirane aktivnosti; ispis na kraju "
+                         "(uz --watch nakon svake promjene), ili JSON zapis po fajlu u FAJL "
+                         "(analiza tada ne čita keš)")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="ne koristi keš rezultata analize")
+    ap.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                    help="direktorij keša (default: .analyzer_cache)")
+    ap.add_argument("--cache-size", type=float, default=None, metavar="MB",
+                    help="maksimalna veličina keša u MB (default: 256)")
+    return ap.parse_args(argv)
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("👉 Upotreba: python run_analyzer.py fajl.php")
+    if len(sys.argv) < 2:
+        print("👉 Upotreba: python run_analyzer.py fajl.php | direktorij | 'glob/**/*.php' [-j N]")
         sys.exit(1)
-    main(sys.argv[1])
+    args = parse_args(sys.argv[1:])
+    args.formats = list(dict.fromkeys(args.formats))
+    cache_dir = None if args.no_cache else args.cache_dir
+    render = None if args.no_render else args.render_backend
+    visitor_options = {"max_inline_depth": args.max_inline_depth,
+                       "max_inline_nodes": args.max_inline_nodes,
+                       "inline_calls": not args.split_functions}
+    diagram_options = {"max_nodes": args.max_diagram_nodes,
+                       "collapsed_parts": args.collapsed_diagrams}
+    profiler = start_cprofile() if args.cprofile else None
+    cprofile_dir = tempfile.mkdtemp(prefix="cprofile_") if args.cprofile else None
+    try:
+        if args.watch:
+            code = run_watch(args.paths, render=render,
+                             cache_dir=cache_dir, cache_size_mb=args.cache_size,
+                             interval=args.interval, debounce=args.debounce,
+                             visitor_options=visitor_options, formats=args.formats,
+                             diagram_options=diagram_options,
+                             profile=args.profile, memprofile=args.memprofile,
+                             rule_profile=args.rule_profile,
+                             visitor_counters=args.visitor_counters)
+        elif len(args.paths) == 1 and os.path.isfile(args.paths[0]) and args.jobs is None:
+            main(args.paths[0], render=render,
+                 cache_dir=cache_dir, cache_size_mb=args.cache_size,
+                 visitor_options=visitor_options, formats=args.formats,
+                 diagram_options=diagram_options,
+                 profile=args.profile, memprofile=args.memprofile,
+                 rule_profile=args.rule_profile, visitor_counters=args.visitor_counters)
+            code = 0
+        else:
+            code = run_batch(args.paths, jobs=args.jobs, render=render,
+                             cache_dir=cache_dir, cache_size_mb=args.cache_size,
+                             visitor_options=visitor_options, formats=args.formats,
+                             diagram_options=diagram_options,
+                             profile=args.profile, memprofile=args.memprofile,
+                             rule_profile=args.rule_profile, cprofile_dir=cprofile_dir,
+                             visitor_counters=args.visitor_counters)
+    finally:
+        if profiler is not None:
+            files = save_cprofile(args.cprofile, profiler, cprofile_dir)
+            shutil.rmtree(cprofile_dir, ignore_errors=True)
+            print(f"cProfile: {files[0]}, {files[1]}")
+    sys.exit(code)
@@ -0,0 +1,99 @@
+import os
+import stat
+import hashlib
+import tempfile
+
+# umask se može pročitati samo postavljanjem, pa jednom pri učitavanju
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def uml_digest(uml_code):
+    # uml_code: string ili niz komada teksta (iter_activity_uml_text)
+    h = hashlib.sha256()
+    for chunk in ((uml_code,) if isinstance(uml_code, str) else uml_code):
+        h.update(chunk.encode("utf-8"))
+    return h.hexdigest()
+
+def file_digest(path):
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                h.update(block)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+def file_mode(path):
+    # kao open(path, "w"): postojeći fajl zadržava svoja prava, novi dobija
+    # 0666 & ~umask (mkstemp pravi 0600)
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+def atomic_write(path, data):
+    # temp fajl u istom direktoriju + os.replace: prekinut run nikad ne
+    # ostavlja napola upisan .uml/.png
+    mode = "wb" if isinstance(data, bytes) else "w"
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        if mode == "wb":
+            with os.fdopen(fd, mode) as f:
+                f.write(data)
+        else:
+            with os.fdopen(fd, mode, encoding="utf-8", newline="") as f:
+                for chunk in ((data,) if isinstance(data, str) else data):
+                    f.write(chunk)
+        os.chmod(tmp, file_mode(path))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def write_if_changed(path, data):
+    # Kao atomic_write, ali se tekst (string ili komadi) hashira dok se piše u
+    # temp fajl, pa se generiše samo jednom; postojeći fajl istog sadržaja se
+    # ne dira. Vraća (digest, da li je fajl upisan).
+    h = hashlib.sha256()
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            for chunk in ((data,) if isinstance(data, str) else data):
+                h.update(chunk.encode("utf-8"))
+                f.write(chunk)
+        digest = h.hexdigest()
+        if file_digest(path) == digest:
+            os.remove(tmp)
+            return digest, False
+        os.chmod(tmp, file_mode(path))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return digest, True
+
+def sidecar_path(uml_file):
+    return uml_file + ".sha256"
+
+def png_path(uml_file):
+    return os.path.splitext(uml_file)[0] + ".png"
+
+def is_rendered(uml_file, digest):
+    # Sidecar sadrži hash UML teksta za koji je PNG uspješno kreiran; piše se
+    # tek nakon renderovanja, pa prekinut run znači ponovno renderovanje.
+    try:
+        with open(sidecar_path(uml_file), "r", encoding="ascii") as f:
+            stored = f.read().strip()
+    except OSError:
+        return False
+    return stored == digest and os.path.exists(uml_file) and os.path.exists(png_path(uml_file))
+
+def mark_rendered(uml_file, digest):
+    atomic_write(sidecar_path(uml_file), digest + "\n")
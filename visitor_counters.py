@@ -0,0 +1,80 @@
+import json
+
+# Brojači posla u MyVisitor-u (--visitor-counters). Uključuju se samo na
+# zahtjev: bez njih visitor ne radi ništa dodatno osim provjere na None.
+class VisitorCounters:
+    def __init__(self):
+        self.inlined       = {}    # funcName -> broj inlininga (i iz sažetka)
+        self.summary_reuse = 0     # inlininzi riješeni ponovnim korištenjem sažetka
+        self.max_depth     = 0     # najveća dubina inlininga
+        self.regex         = {}    # pattern -> broj poziva
+        self.text_calls    = 0     # getText()/text_of pozivi
+        self.text_chars    = 0     # ukupno znakova koje su vratili
+        self.activities    = {}    # tip -> broj kreiranih aktivnosti
+
+    def count_inline(self, name, depth, from_summary=False):
+        self.inlined[name] = self.inlined.get(name, 0) + 1
+        self.max_depth = max(self.max_depth, depth)
+        if from_summary:
+            self.summary_reuse += 1
+
+    def count_regex(self, pattern):
+        self.regex[pattern] = self.regex.get(pattern, 0) + 1
+
+    def count_text(self, text):
+        self.text_calls += 1
+        self.text_chars += len(text)
+
+    def count_activity(self, activity):
+        t = activity["type"]
+        self.activities[t] = self.activities.get(t, 0) + 1
+
+    def as_dict(self):
+        return {
+            "inlined": dict(self.inlined),
+            "summary_reuse": self.summary_reuse,
+            "max_inline_depth": self.max_depth,
+            "regex": dict(self.regex),
+            "text_calls": self.text_calls,
+            "text_chars": self.text_chars,
+            "activities": dict(self.activities),
+        }
+
+def merge_counters(dicts):
+    total = VisitorCounters().as_dict()
+    for d in dicts:
+        for k, v in d.items():
+            if isinstance(v, dict):
+                for name, n in v.items():
+                    total[k][name] = total[k].get(name, 0) + n
+            elif k == "max_inline_depth":
+                total[k] = max(total[k], v)
+            else:
+                total[k] += v
+    return total
+
+def _top(counts, n=8):
+    return ", ".join(f"{k} {v}" for k, v in sorted(counts.items(), key=lambda kv: -kv[1])[:n])
+
+def format_counters(c):
+    activities = sum(c["activities"].values())
+    inlined = sum(c["inlined"].values())
+    regex = sum(c["regex"].values())
+    lines = [
+        f"Aktivnosti kreirane: {activities}" + (f" ({_top(c['activities'])})" if activities else ""),
+        f"Inlining: {inlined} poziva, iz sažetka {c['summary_reuse']}, "
+        f"max. dubina {c['max_inline_depth']}",
+    ]
+    if inlined:
+        lines.append(f"  po funkciji: {_top(c['inlined'])}")
+    lines.append(f"Regex pozivi: {regex}")
+    for pattern, n in sorted(c["regex"].items(), key=lambda kv: -kv[1]):
+        lines.append(f"  {n:>8}  {pattern}")
+    lines.append(f"getText: {c['text_calls']} poziva, {c['text_chars']} znakova")
+    return "\n".join(lines)
+
+def write_counters(path, records, append=False):
+    # jedan JSON zapis po fajlu: {"file": ..., "counters": {...}}
+    with open(path, "a" if append else "w", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")